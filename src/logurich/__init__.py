@@ -22,19 +22,23 @@ from .core import (
     global_context_configure,
     global_context_set,
     init_logger,
+    set_log_level,
     shutdown_logger,
 )
+from .routing import Sink
 from .user_input import timeout, user_input, user_input_with_timeout
 
 __all__ = [
     "init_logger",
     "get_log_queue",
     "configure_child_logging",
+    "set_log_level",
     "shutdown_logger",
     "ctx",
     "ContextValue",
     "BoundLogger",
     "LogurichLogger",
+    "Sink",
     "global_context_configure",
     "global_context_set",
     "console",
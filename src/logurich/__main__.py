@@ -0,0 +1,303 @@
+"""Command line tools for log files: ``python -m logurich query|tail``."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Optional, TextIO
+
+from .console import rich_get_console
+from .core import LOG_LEVEL_CHOICES
+from .handler import CustomHandler, LogurichRenderer
+from .query import (
+    LogEntry,
+    QueryFilter,
+    entry_to_record,
+    is_plain_file,
+    query,
+    render_entry,
+    rotated_files,
+)
+from .tail import DEFAULT_POLL_INTERVAL, follow
+from .utils import context_display_name
+from .writer import BufferedConsoleWriter
+
+OUTPUT_BATCH_SIZE = 64 * 1024
+_RELATIVE_TIME_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_RELATIVE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(text: str) -> float:
+    """Parse an epoch timestamp, an ISO-8601 datetime or an age like ``15m``.
+
+    Datetimes without a UTC offset are in local time.
+    """
+
+    match = _RELATIVE_TIME_RE.match(text)
+    if match is not None:
+        return time.time() - float(match.group(1)) * _RELATIVE_UNITS[match.group(2)]
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid time {text!r}, expected an epoch timestamp, "
+            "an ISO-8601 datetime or an age such as 30s, 15m, 2h or 1d"
+        ) from None
+
+
+def parse_context(text: str) -> tuple[str, str]:
+    key, separator, value = text.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(
+            f"invalid context {text!r}, expected KEY=VALUE"
+        )
+    return context_display_name(key), value
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-l",
+        "--level",
+        type=str.upper,
+        choices=LOG_LEVEL_CHOICES,
+        help="keep records at or above this level",
+    )
+    parser.add_argument("--name", help="keep records of this logger and its children")
+    parser.add_argument(
+        "-c",
+        "--context",
+        type=parse_context,
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="keep records carrying this context value (repeatable); plain "
+        "text files only carry values logged with show_key=True or a label",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print JSON records as written instead of re-rendering them",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="source detail of re-rendered JSON records (repeatable)",
+    )
+    parser.add_argument(
+        "--log-verbose",
+        type=int,
+        choices=range(4),
+        help="log_verbose of plain text files, to tell apart their source "
+        "labels (default: guessed)",
+    )
+
+
+def _build_filter(
+    args: argparse.Namespace,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> QueryFilter:
+    return QueryFilter(
+        start=start,
+        end=end,
+        level=logging.getLevelName(args.level) if args.level else logging.NOTSET,
+        name=args.name,
+        context=tuple(args.context),
+    )
+
+
+def _warn_plain_context(args: argparse.Namespace, path: str) -> None:
+    # Plain files render context values as "[value]" unless logged with
+    # show_key=True or a label, so a context filter may silently match nothing.
+    if args.context and is_plain_file(path):
+        sys.stderr.write(
+            f"logurich: {path}: plain text file, context filters only match "
+            "values logged with show_key=True or a label\n"
+        )
+
+
+def write_entries(
+    entries: Iterable[LogEntry],
+    output: TextIO,
+    renderer: Optional[LogurichRenderer],
+) -> int:
+    """Write *entries* to *output* in batches and return how many were written."""
+
+    pending: list[str] = []
+    pending_size = 0
+    count = 0
+    for entry in entries:
+        text = entry.text if renderer is None else render_entry(entry, renderer)
+        pending.append(f"{text}\n")
+        pending_size += len(text) + 1
+        count += 1
+        if pending_size >= OUTPUT_BATCH_SIZE:
+            output.write("".join(pending))
+            pending.clear()
+            pending_size = 0
+    if pending:
+        output.write("".join(pending))
+    output.flush()
+    return count
+
+
+def _query_command(args: argparse.Namespace) -> int:
+    paths: list[str] = []
+    for path in args.files:
+        files = rotated_files(path) if args.rotated else [path]
+        if not files:
+            sys.stderr.write(f"logurich: {path}: no such file\n")
+            return 1
+        _warn_plain_context(args, files[-1])
+        paths.extend(files)
+    query_filter = _build_filter(args, args.since, args.until)
+    renderer = None if args.json else LogurichRenderer(args.verbose)
+    write_entries(
+        query(
+            paths,
+            query_filter,
+            workers=args.workers,
+            log_verbose=args.log_verbose,
+        ),
+        sys.stdout,
+        renderer,
+    )
+    return 0
+
+
+def _tail_command(args: argparse.Namespace) -> int:
+    if not os.path.isfile(args.file):
+        sys.stderr.write(f"logurich: {args.file}: no such file\n")
+        return 1
+    _warn_plain_context(args, args.file)
+    writer = BufferedConsoleWriter(rich_get_console())
+    handler = (
+        None
+        if args.json
+        else CustomHandler(LogurichRenderer(args.verbose), writer=writer)
+    )
+    batches = follow(
+        args.file,
+        _build_filter(args),
+        lines=args.lines,
+        since=args.since,
+        forever=args.follow,
+        poll_interval=args.poll_interval,
+        log_verbose=args.log_verbose,
+    )
+    try:
+        for batch in batches:
+            if not batch:
+                # Idle file: show what is pending instead of waiting for more.
+                writer.flush()
+                continue
+            for entry in batch:
+                if handler is None or entry.data is None:
+                    writer.write(f"{entry.text}\n")
+                else:
+                    handler.handle(entry_to_record(entry))
+    finally:
+        batches.close()
+        if handler is not None:
+            handler.close()
+        else:
+            writer.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m logurich", description="Search and follow logurich log files."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = commands.add_parser(
+        "query", help="print the records of log files matching filters"
+    )
+    query_parser.add_argument("files", nargs="+", metavar="FILE")
+    query_parser.add_argument(
+        "--since", type=parse_time, help="keep records logged at or after this time"
+    )
+    query_parser.add_argument(
+        "--until", type=parse_time, help="keep records logged at or before this time"
+    )
+    query_parser.add_argument(
+        "-r",
+        "--rotated",
+        action="store_true",
+        help="also search the rotated backups of each file, oldest first",
+    )
+    query_parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes scanning the files in chunks (default: 1, "
+        "0 for one per CPU)",
+    )
+    _add_filter_arguments(query_parser)
+    query_parser.set_defaults(handler=_query_command)
+
+    tail_parser = commands.add_parser(
+        "tail", help="print the last records of a log file and follow it"
+    )
+    tail_parser.add_argument("file", metavar="FILE")
+    tail_parser.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help="keep printing records as they are appended, across rotations",
+    )
+    tail_parser.add_argument(
+        "-n",
+        "--lines",
+        type=int,
+        default=10,
+        help="number of existing records to print first (default: 10)",
+    )
+    tail_parser.add_argument(
+        "--since",
+        type=parse_time,
+        help="catch up from this time, backups included, instead of --lines",
+    )
+    tail_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="seconds between checks of an idle file",
+    )
+    _add_filter_arguments(tail_parser)
+    tail_parser.set_defaults(handler=_tail_command)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # The reader went away (e.g. ``| head``): silence the final flush.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except OSError as exc:
+        sys.stderr.write(f"logurich: {exc}\n")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,22 +2,232 @@
 
 from __future__ import annotations
 
-from typing import Any, Optional
+import io
+import signal
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Optional, Union
 
-from rich.console import Console, ConsoleRenderable
+from rich.console import (
+    Console,
+    ConsoleDimensions,
+    ConsoleOptions,
+    ConsoleRenderable,
+    RenderResult,
+)
 from rich.pretty import Pretty
-from rich.table import Table
+from rich.segment import Segment
 from rich.text import Text
 
 _console: Optional[Console] = None
+_console_version = 0
+# Arguments of the shared console reused by off-screen consoles.
+_OFFSCREEN_OPTIONS = ("markup", "emoji", "highlight", "theme")
+_console_options: dict[str, Any] = {}
+_offscreen = threading.local()
+_render_cache: Optional[RenderCache] = None
+_size_generation = 0
+SIZE_REFRESH_INTERVAL = 1.0
+
+
+def _on_resize(signum: int, frame: Any) -> None:
+    global _size_generation
+    _size_generation += 1
+
+
+def install_resize_handler() -> bool:
+    """Refresh cached console dimensions on ``SIGWINCH`` where available.
+
+    The handler is only installed from the main thread and over the default
+    disposition; a ``None`` disposition is a handler installed outside
+    Python and is left alone. Without it, dimensions are refreshed every
+    ``SIZE_REFRESH_INTERVAL`` seconds. :func:`uninstall_resize_handler`
+    restores the default disposition.
+    """
+
+    sigwinch = getattr(signal, "SIGWINCH", None)
+    if sigwinch is None or threading.current_thread() is not threading.main_thread():
+        return False
+    current = signal.getsignal(sigwinch)
+    if current is _on_resize:
+        return True
+    if current is not signal.SIG_DFL:
+        return False
+    signal.signal(sigwinch, _on_resize)
+    return True
+
+
+def uninstall_resize_handler() -> None:
+    """Restore the ``SIGWINCH`` disposition replaced by the resize handler."""
+
+    if (
+        _resize_handler_active()
+        and threading.current_thread() is threading.main_thread()
+    ):
+        signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+
+
+def _resize_handler_active() -> bool:
+    sigwinch = getattr(signal, "SIGWINCH", None)
+    return sigwinch is not None and signal.getsignal(sigwinch) is _on_resize
+
+
+class LogurichConsole(Console):
+    """Console caching its terminal dimensions.
+
+    Rich queries the terminal size on every ``width`` access unless the size
+    is fixed. The measured size is kept until ``SIGWINCH`` is received (see
+    :func:`install_resize_handler`) or, without that handler, for
+    ``SIZE_REFRESH_INTERVAL`` seconds.
+    """
+
+    @property
+    def size(self) -> ConsoleDimensions:
+        state = self.__dict__
+        key = (self._width, self._height)
+        cached = state.get("_logurich_size")
+        if cached is not None and cached[0] == key:
+            if _resize_handler_active():
+                if cached[1] == _size_generation:
+                    return cached[3]
+            elif time.monotonic() < cached[2]:
+                return cached[3]
+        size = Console.size.fget(self)
+        state["_logurich_size"] = (
+            key,
+            _size_generation,
+            time.monotonic() + SIZE_REFRESH_INTERVAL,
+            size,
+        )
+        return size
+
+    @size.setter
+    def size(self, new_size: tuple[int, int]) -> None:
+        Console.size.fset(self, new_size)
+
+
+class RenderCache:
+    """Size-bounded LRU cache of rendered renderable lines.
+
+    Entries are keyed by the renderable fingerprint (or a user-supplied cache
+    key), the content width and the console color system, so the same
+    renderable is laid out by Rich only once per width and ANSI mode.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        if max_size <= 0:
+            raise ValueError("render cache size must be a positive integer")
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, list[list[Segment]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[list[list[Segment]]]:
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is not None:
+                self._entries.move_to_end(key)
+            return lines
+
+    def put(self, key: Hashable, lines: list[list[Segment]]) -> None:
+        with self._lock:
+            self._entries[key] = lines
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def rich_configure_render_cache(max_size: int = 0) -> Optional[RenderCache]:
+    """Enable an LRU render cache of *max_size* entries, or disable it with 0."""
+
+    global _render_cache
+    _render_cache = RenderCache(max_size) if max_size else None
+    return _render_cache
+
+
+def _render_fingerprint(item: Any, cache_key: Optional[Hashable]) -> Optional[Hashable]:
+    if cache_key is not None:
+        return ("key", cache_key)
+    if isinstance(item, ConsoleRenderable):
+        # Rich renderables have no stable value representation.
+        return None
+    try:
+        return ("repr", type(item), repr(item))
+    except Exception:
+        return None
+
+
+def _offscreen_console(ansi: bool = True) -> Console:
+    """Return this thread's off-screen console matching the shared console.
+
+    String rendering never touches the shared console, so it neither waits on
+    its lock nor interleaves with live output. Off-screen consoles are rebuilt
+    when the shared console is replaced or its size or color system changes;
+    with ``ansi=False`` they render without any styling. Markup, emoji,
+    highlighting and theme follow the :func:`rich_configure_console`
+    arguments.
+    """
+
+    shared = rich_get_console()
+    color_system = shared.color_system if ansi else None
+    key = (_console_version, shared.width, shared.height, color_system)
+    consoles = getattr(_offscreen, "consoles", None)
+    if consoles is None:
+        consoles = _offscreen.consoles = {}
+    entry = consoles.get(ansi)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    console = Console(
+        file=io.StringIO(),
+        width=shared.width,
+        height=shared.height,
+        color_system=color_system,
+        force_terminal=shared.is_terminal,
+        force_jupyter=False,
+        force_interactive=False,
+        soft_wrap=shared.soft_wrap,
+        tab_size=shared.tab_size,
+        no_color=shared.no_color,
+        safe_box=shared.safe_box,
+        legacy_windows=False,
+        **_console_options,
+    )
+    consoles[ansi] = (key, console)
+    return console
+
+
+def _rendered_lines(
+    data: Any,
+    content_width: int,
+    fingerprint: Optional[Hashable] = None,
+) -> list[list[Segment]]:
+    console = _offscreen_console()
+    cache = _render_cache
+    key = None
+    if cache is not None and fingerprint is not None:
+        key = (fingerprint, content_width, console.color_system)
+        lines = cache.get(key)
+        if lines is not None:
+            return lines
+    options = console.options.update(
+        width=min(content_width, console.width), no_wrap=True, overflow="ellipsis"
+    )
+    lines = console.render_lines(data, options, pad=False)
+    if key is not None:
+        cache.put(key, lines)
+    return lines
 
 
 def rich_to_str(
     *objects: Any, ansi: bool = True, width: Optional[int] = None, **kwargs: Any
 ) -> str:
-    console = rich_get_console()
     if width is not None and width < 1:
         raise ValueError("width must be >= 1")
+    console = _offscreen_console(ansi)
     print_kwargs = dict(kwargs)
     if width is not None:
         print_kwargs["width"] = width
@@ -25,46 +235,76 @@ def rich_to_str(
         print_kwargs["overflow"] = "ellipsis"
     with console.capture() as capture:
         console.print(*objects, **print_kwargs)
-    output = capture.get()
-    if ansi:
-        return output
-    return Text.from_ansi(output).plain
+    return capture.get()
+
+
+class PrefixedLines:
+    """Rendered lines of a renderable, each preceded by the same prefix.
+
+    The renderable is laid out once into segment lines; printing only emits
+    the prefix and line segments, and :meth:`plain` joins their text without
+    any ANSI round-trip.
+    """
+
+    def __init__(self, prefix: list[Segment], lines: list[list[Segment]]) -> None:
+        self.prefix = prefix
+        self.lines = lines
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        new_line = Segment.line()
+        for line in self.lines:
+            yield from self.prefix
+            yield from line
+            yield new_line
+
+    def plain(self) -> str:
+        prefix = "".join(segment.text for segment in self.prefix)
+        return "\n".join(
+            prefix + "".join(segment.text for segment in line if not segment.control)
+            for line in self.lines
+        )
 
 
 def rich_format_grid(
-    text_rich_prefix: Text, data: ConsoleRenderable, content_width: Optional[int]
-) -> Table:
-    grid = Table.grid()
-    grid.add_column(no_wrap=True)
-    grid.add_column(no_wrap=True)
-    content = Text.from_ansi(rich_to_str(data, width=content_width, end=""))
-    lines = content.split()
-    for line in lines:
-        grid.add_row(text_rich_prefix.copy(), line)
-    return grid
+    text_rich_prefix: Union[Text, list[Segment]],
+    data: ConsoleRenderable,
+    content_width: int,
+    fingerprint: Optional[Hashable] = None,
+) -> PrefixedLines:
+    if isinstance(text_rich_prefix, Text):
+        text_rich_prefix = _prefix_segments(text_rich_prefix)
+    return PrefixedLines(
+        text_rich_prefix, _rendered_lines(data, content_width, fingerprint)
+    )
+
+
+def _prefix_segments(text_rich_prefix: Text) -> list[Segment]:
+    return list(text_rich_prefix.render(rich_get_console(), end=""))
 
 
 def _render_rich_item(
     item: Any,
     text_rich_prefix: Text,
+    prefix_segments: list[Segment],
     available_width: int,
     effective_width: int,
+    cache_key: Optional[Hashable] = None,
 ) -> ConsoleRenderable:
     """Render a single item with rich markup formatting."""
     if isinstance(item, str):
         content = Text.from_markup(item)
         if available_width != effective_width:
-            return rich_format_grid(text_rich_prefix, content, effective_width)
+            return rich_format_grid(prefix_segments, content, effective_width)
         return text_rich_prefix.copy().append(content)
 
-    if isinstance(item, ConsoleRenderable):
-        return rich_format_grid(text_rich_prefix, item, effective_width)
-
-    return rich_format_grid(
-        text_rich_prefix,
-        Pretty(item, max_depth=2, max_length=2),
-        effective_width,
+    fingerprint = (
+        _render_fingerprint(item, cache_key) if _render_cache is not None else None
     )
+    if not isinstance(item, ConsoleRenderable):
+        item = Pretty(item, max_depth=2, max_length=2)
+    return rich_format_grid(prefix_segments, item, effective_width, fingerprint)
 
 
 def _render_plain_item(
@@ -77,35 +317,56 @@ def _render_plain_item(
         return Text.from_ansi(item)
 
     if content_width is not None:
-        rendered = rich_to_str(item, width=effective_width, end="")
-        return Text.from_ansi(rendered)
+        if not isinstance(item, ConsoleRenderable):
+            item = Pretty(item)
+        return PrefixedLines([], _rendered_lines(item, effective_width))
 
     return item
 
 
+def _content_widths(
+    console_width: int, prefix_length: int, content_width: Optional[int]
+) -> tuple[int, int]:
+    available_width = max(1, console_width - prefix_length)
+    if content_width is None:
+        return available_width, available_width
+    return available_width, min(available_width, content_width)
+
+
 def rich_console_renderer(
-    prefix: str, rich_format: bool, data: Any, content_width: Optional[int] = None
+    prefix: str,
+    rich_format: bool,
+    data: Any,
+    content_width: Optional[int] = None,
+    cache_key: Optional[Hashable] = None,
 ) -> list[ConsoleRenderable]:
     console = rich_get_console()
     rich_prefix = prefix[:-2] + "# "
     text_rich_prefix = Text.from_markup(rich_prefix)
-    available_width = max(1, console.width - len(text_rich_prefix))
-    effective_width = (
-        min(available_width, content_width)
-        if content_width is not None
-        else available_width
+    available_width, effective_width = _content_widths(
+        console.width, len(text_rich_prefix), content_width
     )
 
     if rich_format:
+        prefix_segments = _prefix_segments(text_rich_prefix)
         return [
-            _render_rich_item(r, text_rich_prefix, available_width, effective_width)
-            for r in data
+            _render_rich_item(
+                r,
+                text_rich_prefix,
+                prefix_segments,
+                available_width,
+                effective_width,
+                None if cache_key is None else (cache_key, index),
+            )
+            for index, r in enumerate(data)
         ]
     return [_render_plain_item(r, effective_width, content_width) for r in data]
 
 
 def rich_set_console(console: Console) -> None:
-    global _console
+    global _console, _console_version, _console_options
+    _console_version += 1
+    _console_options = {}
     if _console is None:
         _console = console
         return
@@ -115,7 +376,7 @@ def rich_set_console(console: Console) -> None:
 def rich_get_console() -> Console:
     global _console
     if _console is None:
-        _console = Console(markup=True)
+        _console = LogurichConsole(markup=True)
     return _console
 
 
@@ -129,7 +390,12 @@ def rich_configure_console(*args: Any, **kwargs: Any) -> Console:
     Return:
         Return the logurich console
     """
+    global _console_version, _console_options
     new_console = Console(*args, **kwargs)
+    _console_version += 1
+    _console_options = {
+        name: kwargs[name] for name in _OFFSCREEN_OPTIONS if name in kwargs
+    }
     _console = rich_get_console()
     _console.__dict__ = new_console.__dict__
     return _console
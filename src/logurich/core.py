@@ -12,9 +12,10 @@ import multiprocessing as mp
 import os
 import threading
 import traceback
-from collections.abc import Mapping
+from collections.abc import Hashable, Mapping, Sequence
 from dataclasses import dataclass
 from datetime import time as datetime_time
+from datetime import timedelta
 from pathlib import Path
 from typing import Any, Literal, Optional, Union, get_args
 
@@ -22,14 +23,37 @@ from rich.console import ConsoleRenderable
 from rich.markup import escape
 from rich.traceback import Traceback
 
+from .console import (
+    install_resize_handler,
+    rich_configure_render_cache,
+    rich_get_console,
+    uninstall_resize_handler,
+)
+from .filesink import COMPRESSION_EXTENSIONS, Compression, LogurichFileHandler
 from .handler import (
     CustomHandler,
     CustomRichHandler,
     LogurichFileFormatter,
     LogurichRenderer,
 )
+from .highlight import PatternHighlighter, validate_highlight_patterns
+from .routing import Route, Sink, SinkRouter
+from .serialization import JsonDumps, validate_json_schema
 from .struct import logger_state
+from .transport import (
+    LoadShedder,
+    LogurichQueue,
+    LogurichQueueListener,
+    _validate_watermarks,
+    stamp_record,
+)
 from .utils import parse_bool_env
+from .writer import (
+    BufferedConsoleWriter,
+    ConsoleWriter,
+    NonBlockingConsoleWriter,
+    OverflowPolicy,
+)
 
 _context_state: contextvars.ContextVar[dict[str, ContextValue] | None] = (
     contextvars.ContextVar("logurich_context_state", default=None)
@@ -65,12 +89,6 @@ def _wrap_markup(style: Optional[str], text: str) -> str:
     return f"[{normalized}]{text}[/{normalized}]"
 
 
-def _context_display_name(name: str) -> str:
-    if name.startswith("context::"):
-        return name.split("::", 1)[1]
-    return name
-
-
 @dataclass(frozen=True)
 class ContextValue:
     """Display metadata for contextual log values."""
@@ -103,6 +121,11 @@ class ContextValue:
             right = "]"
         return f"{left}{body}{right}"
 
+    def render_plain(self, key: str) -> str:
+        label = self._label(key)
+        value_text = str(self.value)
+        return f"[{label}={value_text}]" if label else f"[{value_text}]"
+
 
 def _normalize_context_key(key: str) -> str:
     if key.startswith("context::"):
@@ -170,9 +193,15 @@ if hasattr(_BaseLoggerClass, "_logurich_logger_class"):
 else:
 
     class LogurichLogger(_BaseLoggerClass):
-        """Custom logger exposing Logurich convenience methods."""
+        """Custom logger exposing Logurich convenience methods.
+
+        Set ``markup = False`` on a logger to render its messages verbatim
+        instead of parsing Rich markup; ``extra={"markup": False}`` does the
+        same for a single call.
+        """
 
         _logurich_logger_class = True
+        markup = True
 
         def ctx(
             self,
@@ -201,6 +230,7 @@ else:
             prefix: bool = True,
             end: str = "\n",
             width: Optional[int] = None,
+            cache_key: Optional[Hashable] = None,
         ) -> None:
             self.log(
                 _coerce_level(log_level),
@@ -209,6 +239,7 @@ else:
                     "renderables": renderables,
                     "render_prefix": prefix,
                     "render_width": width,
+                    "render_cache_key": cache_key,
                     "end": end,
                 },
                 stacklevel=2,
@@ -280,6 +311,7 @@ class BoundLogger(logging.LoggerAdapter):
         prefix: bool = True,
         end: str = "\n",
         width: Optional[int] = None,
+        cache_key: Optional[Hashable] = None,
     ) -> None:
         self.log(
             _coerce_level(log_level),
@@ -288,6 +320,7 @@ class BoundLogger(logging.LoggerAdapter):
                 "renderables": renderables,
                 "render_prefix": prefix,
                 "render_width": width,
+                "render_cache_key": cache_key,
                 "end": end,
             },
             stacklevel=2,
@@ -372,11 +405,18 @@ def _configure_level_by_module(
     return level_per_module
 
 
-def _resolve_level_for_record(name: str) -> int:
-    min_level = logger_state.get("min_level")
-    if min_level is None:
-        return logging.INFO
+_LEVEL_CACHE: dict[str, int] = {}
+_LEVEL_CACHE_MAX_SIZE = 4096
+
 
+def _apply_levels(
+    min_level: Optional[int], level_by_module: Optional[dict[str, int]]
+) -> None:
+    logger_state.update({"min_level": min_level, "level_by_module": level_by_module})
+    _LEVEL_CACHE.clear()
+
+
+def _lookup_level(name: str, min_level: int) -> int:
     level_per_module = logger_state.get("level_by_module") or {}
     if not level_per_module:
         return min_level
@@ -394,6 +434,32 @@ def _resolve_level_for_record(name: str) -> int:
     return level
 
 
+def _resolve_level_for_record(name: str) -> int:
+    level = _LEVEL_CACHE.get(name)
+    if level is not None:
+        return level
+
+    min_level = logger_state.get("min_level")
+    if min_level is None:
+        return logging.INFO
+
+    level = _lookup_level(name, min_level)
+    if len(_LEVEL_CACHE) >= _LEVEL_CACHE_MAX_SIZE:
+        _LEVEL_CACHE.clear()
+    _LEVEL_CACHE[name] = level
+    return level
+
+
+def _resolve_producer_level(name: str) -> int:
+    """Return the lowest level any output accepts: console, files or sinks."""
+
+    level = _resolve_level_for_record(name)
+    sink_level = logger_state.get("sink_level")
+    if sink_level is not None and sink_level < level:
+        return sink_level
+    return level
+
+
 class _ProducerFilter(logging.Filter):
     """Enrich log records before direct output or enqueueing."""
 
@@ -410,6 +476,7 @@ class _ProducerFilter(logging.Filter):
         record.render_width = getattr(record, "render_width", None)
         record.end = getattr(record, "end", "\n")
         record.rich_highlight = bool(getattr(record, "rich_highlight", False))
+        record.markup = self._resolve_markup(record)
 
         if record.exc_info:
             record.formatted_exception = "".join(
@@ -440,6 +507,14 @@ class _ProducerFilter(logging.Filter):
 
         return True
 
+    @staticmethod
+    def _resolve_markup(record: logging.LogRecord) -> bool:
+        markup = getattr(record, "markup", None)
+        if markup is None:
+            logger_ = logging.Logger.manager.loggerDict.get(record.name)
+            markup = getattr(logger_, "markup", True)
+        return bool(markup)
+
     @staticmethod
     def _normalize_renderables(renderables: Any) -> tuple[Any, ...]:
         if renderables is None:
@@ -458,9 +533,77 @@ class _OutputFilter(logging.Filter):
         return record.levelno >= _resolve_level_for_record(record.name)
 
 
+class _SinkLevelFilter(logging.Filter):
+    """Drop records below every level of the sink router."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= _resolve_producer_level(record.name)
+
+
 class _LogurichQueueHandler(logging.handlers.QueueHandler):
     """Queue handler that preserves enriched log record attributes."""
 
+    def __init__(self, queue: Any) -> None:
+        super().__init__(queue)
+        watermarks = getattr(queue, "shed_watermarks", None)
+        self._shedder = LoadShedder(*watermarks) if watermarks else None
+        self._shares_levels = isinstance(queue, LogurichQueue)
+        self._levels_version = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if self._shares_levels:
+            self._sync_levels()
+        if logger_state.get("min_level") is not None and (
+            record.levelno < _resolve_producer_level(record.name)
+        ):
+            return False
+        if self._shedder is not None and not self._admit(record):
+            return False
+        stamp_record(record)
+        return super().handle(record)
+
+    def _sync_levels(self) -> None:
+        if self.queue.levels_version() == self._levels_version:
+            return
+        version, min_level, level_by_module, sink_level = self.queue.read_levels()
+        self._levels_version = version
+        if min_level is not None:
+            _apply_levels(min_level, level_by_module)
+            logger_state["sink_level"] = sink_level
+
+    def _admit(self, record: logging.LogRecord) -> bool:
+        shedder = self._shedder
+        backlog = self.queue.backlog()
+        transition = shedder.update(backlog)
+        if transition is not None:
+            self._emit_shed_summary(backlog, *transition)
+        return shedder.admit(record)
+
+    def _emit_shed_summary(self, backlog: int, previous: int, current: int) -> None:
+        state = (
+            f"dropping records below {logging.getLevelName(current)}"
+            if current
+            else "all levels restored"
+        )
+        if current > previous:
+            msg = "Load shedding: backlog at %d records, %s"
+            args: tuple[Any, ...] = (backlog, state)
+        else:
+            dropped = self._shedder.pop_dropped()
+            details = ", ".join(f"{name}={count}" for name, count in dropped.items())
+            msg = "Load shedding: backlog drained to %d records, %s (dropped %d%s)"
+            args = (
+                backlog,
+                state,
+                sum(dropped.values()),
+                f": {details}" if details else "",
+            )
+        summary = logging.LogRecord(
+            _internal_logger.name, logging.WARNING, __file__, 0, msg, args, None
+        )
+        stamp_record(summary)
+        super().handle(summary)
+
     def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
         prepared = copy.copy(record)
         _PRODUCER_FILTER.filter(prepared)
@@ -475,8 +618,14 @@ class _LogurichQueueHandler(logging.handlers.QueueHandler):
 
 _PRODUCER_FILTER = _ProducerFilter()
 _OUTPUT_FILTER = _OutputFilter()
+_SINK_LEVEL_FILTER = _SinkLevelFilter()
 
 LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+RotationCondition = Union[str, int, timedelta]
+_ROTATION_ERROR = (
+    "rotation must be None, an integer, 'midnight', a string in HH:MM format, "
+    "a timedelta, or a sequence combining one size and one time condition"
+)
 LOG_LEVEL_CHOICES: tuple[str, ...] = get_args(LogLevel)
 
 
@@ -562,14 +711,59 @@ def _remove_handlers(logger_: logging.Logger) -> list[logging.Handler]:
 
 
 def _build_console_handler(
-    log_verbose: int, *, rich_handler: bool, serialize: bool
+    log_verbose: int,
+    *,
+    rich_handler: bool,
+    serialize: bool,
+    plain_console: Optional[bool] = None,
+    json_text: bool = True,
+    json_dumps: Optional[JsonDumps] = None,
+    json_schema: Optional[Mapping[str, str]] = None,
+    flush_interval: Optional[float] = None,
+    overflow: Optional[OverflowPolicy] = None,
+    rich_compact: bool = False,
+    highlight_patterns: Optional[tuple[str, ...]] = None,
+    highlight_max_length: Optional[int] = None,
 ) -> logging.Handler:
-    renderer = LogurichRenderer(log_verbose)
+    renderer = LogurichRenderer(
+        log_verbose,
+        json_text=json_text,
+        json_dumps=json_dumps,
+        json_schema=json_schema,
+    )
+    highlighter = (
+        PatternHighlighter(highlight_patterns)
+        if highlight_patterns is not None
+        else None
+    )
+    writer: Optional[ConsoleWriter]
+    if overflow is not None:
+        writer = NonBlockingConsoleWriter(rich_get_console(), overflow=overflow)
+    elif flush_interval is not None:
+        writer = BufferedConsoleWriter(
+            rich_get_console(), flush_interval=flush_interval
+        )
+    else:
+        writer = None
     if serialize or not rich_handler:
-        handler: logging.Handler = CustomHandler(renderer, serialize=serialize)
+        handler: logging.Handler = CustomHandler(
+            renderer,
+            serialize=serialize,
+            plain=plain_console,
+            writer=writer,
+            highlighter=highlighter,
+            highlight_max_length=highlight_max_length,
+        )
     else:
+        rich_kwargs: dict[str, Any] = {}
+        if highlighter is not None:
+            rich_kwargs["highlighter"] = highlighter
         handler = CustomRichHandler(
             renderer,
+            writer=writer,
+            compact=rich_compact,
+            highlight_max_length=highlight_max_length,
+            **rich_kwargs,
             rich_tracebacks=True,
             markup=True,
             tracebacks_show_locals=True,
@@ -594,59 +788,128 @@ def _parse_rotation_time(rotation: str) -> datetime_time:
     return datetime_time(hour=hour, minute=minute)
 
 
-def _build_file_handler(
-    log_path: Path,
-    *,
-    log_verbose: int,
-    serialize: bool,
-    rotation: Optional[Union[str, int]],
-    retention: Optional[int],
-) -> logging.Handler:
-    if retention is not None and (not isinstance(retention, int) or retention < 0):
-        raise TypeError("retention must be a non-negative integer or None")
+def _parse_rotation(
+    rotation: Optional[Union[RotationCondition, Sequence[RotationCondition]]],
+) -> tuple[Optional[int], Optional[datetime_time], Optional[timedelta]]:
+    """Split ``rotation`` into ``(max_bytes, at_time, interval)``."""
 
     if rotation is None:
-        handler: logging.Handler = logging.FileHandler(log_path, encoding="utf-8")
-    elif isinstance(rotation, int):
-        if rotation <= 0:
-            raise ValueError(
-                "rotation must be a positive integer when using size-based rotation"
-            )
-        handler = logging.handlers.RotatingFileHandler(
-            log_path,
-            maxBytes=rotation,
-            backupCount=retention or 0,
-            encoding="utf-8",
-        )
-    elif isinstance(rotation, str):
-        if rotation == "midnight":
-            handler = logging.handlers.TimedRotatingFileHandler(
-                log_path,
-                when="midnight",
-                backupCount=retention or 0,
-                encoding="utf-8",
+        return None, None, None
+    conditions = (
+        rotation if isinstance(rotation, (list, tuple)) and rotation else (rotation,)
+    )
+    max_bytes: Optional[int] = None
+    at_time: Optional[datetime_time] = None
+    interval: Optional[timedelta] = None
+    for condition in conditions:
+        if isinstance(condition, bool):
+            raise TypeError(_ROTATION_ERROR)
+        if isinstance(condition, int):
+            if condition <= 0:
+                raise ValueError(
+                    "rotation must be a positive integer when using size-based rotation"
+                )
+            if max_bytes is not None:
+                raise ValueError("rotation can combine at most one size condition")
+            max_bytes = condition
+            continue
+        if isinstance(condition, str):
+            if at_time is not None or interval is not None:
+                raise ValueError("rotation can combine at most one time condition")
+            at_time = (
+                datetime_time(0, 0)
+                if condition == "midnight"
+                else _parse_rotation_time(condition)
             )
+        elif isinstance(condition, timedelta):
+            if condition <= timedelta(0):
+                raise ValueError("rotation interval must be a positive timedelta")
+            if at_time is not None or interval is not None:
+                raise ValueError("rotation can combine at most one time condition")
+            interval = condition
         else:
-            handler = logging.handlers.TimedRotatingFileHandler(
-                log_path,
-                when="midnight",
-                atTime=_parse_rotation_time(rotation),
-                backupCount=retention or 0,
-                encoding="utf-8",
-            )
-    else:
-        raise TypeError(
-            "rotation must be None, an integer, 'midnight', or a string in HH:MM format"
-        )
+            raise TypeError(_ROTATION_ERROR)
+    return max_bytes, at_time, interval
 
-    handler.setLevel(logging.NOTSET)
-    handler.setFormatter(
-        LogurichFileFormatter(LogurichRenderer(log_verbose), serialize=serialize)
+
+def _build_file_handler(
+    log_path: Path,
+    *,
+    formatter: LogurichFileFormatter,
+    rotation: Optional[Union[RotationCondition, Sequence[RotationCondition]]],
+    retention: Optional[Union[int, timedelta]],
+    retention_bytes: Optional[int] = None,
+    buffer_size: Optional[int] = None,
+    flush_interval: Optional[float] = None,
+    fsync_interval: Optional[float] = None,
+    compression: Optional[Compression] = None,
+    index_every: Optional[int] = None,
+    index_interval: Optional[float] = None,
+) -> LogurichFileHandler:
+    max_backup_age: Optional[timedelta] = None
+    if isinstance(retention, timedelta):
+        if retention <= timedelta(0):
+            raise ValueError("retention must be a positive timedelta")
+        max_backup_age, retention = retention, None
+    elif retention is not None and (
+        not isinstance(retention, int) or isinstance(retention, bool) or retention < 0
+    ):
+        raise TypeError("retention must be a non-negative integer, a timedelta or None")
+    if retention_bytes is not None and (
+        not isinstance(retention_bytes, int) or retention_bytes <= 0
+    ):
+        raise ValueError("retention_bytes must be a positive integer")
+
+    max_bytes, at_time, interval = _parse_rotation(rotation)
+
+    handler = LogurichFileHandler(
+        log_path,
+        max_bytes=max_bytes,
+        at_time=at_time,
+        interval=interval,
+        backup_count=retention or 0,
+        max_backup_bytes=retention_bytes,
+        max_backup_age=max_backup_age,
+        buffer_size=buffer_size,
+        flush_interval=flush_interval,
+        fsync_interval=fsync_interval,
+        compression=compression,
+        index_every=index_every,
+        index_interval=index_interval,
     )
+    handler.setLevel(logging.NOTSET)
+    handler.setFormatter(formatter)
     handler.addFilter(_OUTPUT_FILTER)
     return handler
 
 
+def _validate_sinks(sinks: Sequence[Sink]) -> None:
+    for sink in sinks:
+        if not isinstance(sink, Sink):
+            raise TypeError("sinks must be a sequence of Sink instances")
+        if sink.level is not None:
+            _coerce_level(sink.level)
+        if sink.modules is not None and (
+            isinstance(sink.modules, str)
+            or not all(isinstance(module, str) for module in sink.modules)
+        ):
+            raise TypeError("Sink modules must be a sequence of logger names")
+        if sink.context is not None and not isinstance(sink.context, Mapping):
+            raise TypeError("Sink context must be a mapping")
+
+
+def _sink_route(sink: Sink, handler: LogurichFileHandler) -> Route:
+    return Route(
+        handler,
+        level=_coerce_level(sink.level) if sink.level is not None else None,
+        modules=tuple(sink.modules) if sink.modules is not None else None,
+        context=tuple(
+            (_normalize_context_key(str(key)), value)
+            for key, value in (sink.context or {}).items()
+        ),
+    )
+
+
 def shutdown_logger() -> None:
     """Stop queue listeners and close all configured handlers."""
 
@@ -667,10 +930,11 @@ def shutdown_logger() -> None:
         with contextlib.suppress(Exception):
             queue.join_thread()
 
+    uninstall_resize_handler()
+    _apply_levels(None, None)
     logger_state.update(
         {
-            "min_level": None,
-            "level_by_module": None,
+            "sink_level": None,
             "rich_highlight": False,
             "queue": None,
             "listener": None,
@@ -715,12 +979,42 @@ def get_log_queue() -> mp.Queue:
     return queue
 
 
+def set_log_level(
+    log_level: Optional[LogLevel] = None,
+    level_by_module: Optional[Mapping[str, Union[str, int]]] = None,
+) -> None:
+    """Change the active levels without reinitializing the logger.
+
+    Arguments left to ``None`` keep their current value; pass an empty mapping
+    to clear ``level_by_module``. With ``enqueue=True`` the new levels are
+    published to child processes, which apply them before enqueueing records.
+    """
+
+    current = logger_state.get("min_level")
+    if current is None:
+        raise RuntimeError("Logger is not initialized. Call init_logger() first.")
+
+    min_level = _coerce_level(log_level) if log_level is not None else current
+    module_levels = (
+        _configure_level_by_module(level_by_module) or None
+        if level_by_module is not None
+        else logger_state.get("level_by_module")
+    )
+    _apply_levels(min_level, module_levels)
+
+    queue = logger_state.get("queue")
+    if isinstance(queue, LogurichQueue) and logger_state.get("listener") is not None:
+        queue.publish_levels(min_level, module_levels, logger_state.get("sink_level"))
+
+
 def configure_child_logging(queue: mp.Queue, logger_name: str = "logurich") -> None:
     """Configure a child process to forward logs to the parent logging queue."""
 
     root = logging.getLogger()
     _close_handlers(_remove_handlers(root))
 
+    if isinstance(queue, LogurichQueue):
+        queue.synchronous = True
     queue_handler = _LogurichQueueHandler(queue)
     queue_handler.setLevel(logging.NOTSET)
     queue_handler.addFilter(_PRODUCER_FILTER)
@@ -750,13 +1044,101 @@ def init_logger(
     level_by_module: Optional[Mapping[str, Union[str, int]]] = None,
     *,
     rich_handler: bool = False,
+    rich_compact: bool = False,
     enqueue: bool = True,
     highlight: bool = False,
-    rotation: Optional[Union[str, int]] = "12:00",
-    retention: Optional[int] = 10,
+    highlight_patterns: Optional[Sequence[str]] = None,
+    highlight_max_length: Optional[int] = None,
+    rotation: Optional[Union[RotationCondition, Sequence[RotationCondition]]] = "12:00",
+    retention: Optional[Union[int, timedelta]] = 10,
+    retention_bytes: Optional[int] = None,
+    compression: Optional[Compression] = None,
+    load_shedding: Optional[tuple[int, int]] = None,
+    reorder_window: Optional[float] = None,
+    plain_console: Optional[bool] = None,
+    serialize_text: bool = True,
+    json_dumps: Optional[JsonDumps] = None,
+    json_schema: Optional[Mapping[str, str]] = None,
+    console_flush_interval: Optional[float] = None,
+    console_overflow: Optional[OverflowPolicy] = None,
+    render_cache_size: int = 0,
+    file_buffer_size: Optional[int] = None,
+    file_flush_interval: Optional[float] = None,
+    file_fsync_interval: Optional[float] = None,
+    file_index_every: Optional[int] = None,
+    file_index_interval: Optional[float] = None,
+    sinks: Optional[Sequence[Sink]] = None,
     force: bool = False,
 ) -> Optional[str]:
-    """Initialize stdlib logging with optional Rich rendering and queue support."""
+    """Initialize stdlib logging with optional Rich rendering and queue support.
+
+    ``highlight_patterns`` limits message highlighting to a selection of
+    ``"urls"``, ``"uuids"``, ``"ips"``, ``"paths"``, ``"booleans"`` and
+    ``"numbers"``, matched in a single regex pass instead of Rich's full
+    ``ReprHighlighter``. Messages longer than ``highlight_max_length``
+    characters are never highlighted.
+
+    ``rich_compact`` makes the ``rich_handler`` render single-line messages as
+    one styled line instead of a table layout per record.
+
+    ``load_shedding`` takes ``(debug_watermark, info_watermark)`` queue backlog
+    thresholds. When set with ``enqueue=True``, producers stop enqueueing
+    ``DEBUG`` and then ``INFO`` records while the listener is behind.
+
+    ``reorder_window`` (seconds) makes the listener hold records up to that
+    long and emit them in creation order across producer processes.
+
+    ``plain_console`` forces (``True``) or disables (``False``) the Rich-free
+    console output path. By default it is used whenever the console does not
+    render styles, such as when stdout is piped.
+
+    With ``LOGURICH_SERIALIZE``, ``serialize_text=False`` drops the rendered
+    ``text`` field from JSON payloads and ``json_dumps`` replaces the JSON
+    encoder (any callable returning ``str`` or UTF-8 ``bytes``).
+    ``json_schema`` replaces the loguru-compatible payload with a flat object
+    mapping output keys to source fields, e.g. ``{"ts": "time.timestamp",
+    "lvl": "level.name", "msg": "message", "*": "extra.*"}``; it is validated
+    and compiled once here.
+
+    ``console_flush_interval`` (seconds) batches console output: rendered
+    records are buffered and written together once the interval elapses, once
+    the buffer is full, or immediately for ``ERROR`` records and above.
+
+    ``console_overflow`` (``"drop"`` or ``"summarize"``) writes console output
+    from a dedicated thread with a bounded buffer, so a slow terminal or pipe
+    reader never blocks logging; records that do not fit are dropped, and
+    with ``"summarize"`` the number of dropped records is reported.
+
+    ``render_cache_size`` enables an LRU cache of that many rendered
+    renderables. Plain data is keyed by its ``repr``; Rich renderables are only
+    cached when logged with ``logger.rich(..., cache_key=...)``.
+
+    ``rotation`` is a size in bytes, ``"midnight"``, a daily ``"HH:MM"`` time
+    or a ``timedelta`` interval. A sequence combines one size and one time
+    condition, rotating on whichever comes first, e.g.
+    ``(timedelta(hours=1), 500 * 1024 * 1024)``.
+    ``retention`` is a backup count or, as a ``timedelta``, a maximum backup
+    age; ``retention_bytes`` also caps the total size of the backups.
+
+    ``file_buffer_size`` (bytes) and ``file_flush_interval`` (seconds) buffer
+    writes to the log file instead of flushing after every record; the buffer
+    is written once full, once the interval elapses (1 second by default) and
+    immediately for ``ERROR`` records and above. ``file_fsync_interval``
+    (seconds) also syncs the file to disk at most that often.
+
+    ``file_index_every`` (records) and ``file_index_interval`` (seconds) write
+    a sidecar time index next to each log file and backup, read back with
+    :func:`logurich.index.read_index` to seek to a time range.
+
+    ``compression`` (``"gzip"``, ``"bz2"`` or ``"lzma"``) compresses rotated
+    log files on a background thread; ``retention`` counts compressed backups.
+
+    ``sinks`` declares additional log files in ``log_folder``, each a
+    :class:`Sink` with its own level, module and context filters, format and
+    rotation. A sink ``level`` replaces the global levels, which only apply to
+    the console, ``log_filename`` and sinks without a level. Routing by logger
+    name and level is cached, and each record is formatted once per format.
+    """
 
     if not force and logger_state.get("min_level") is not None:
         return None
@@ -769,58 +1151,164 @@ def init_logger(
     if env_rich_handler is not None:
         rich_handler = env_rich_handler
 
+    env_plain_console = parse_bool_env("LOGURICH_PLAIN")
+    if env_plain_console is not None:
+        plain_console = env_plain_console
+
     serialize = bool(parse_bool_env("LOGURICH_SERIALIZE"))
     min_level = _coerce_level(log_level)
+    shed_watermarks = (
+        _validate_watermarks(load_shedding) if load_shedding is not None else None
+    )
     module_levels = (
         _configure_level_by_module(level_by_module) if level_by_module else None
     )
+    if json_schema is not None:
+        json_schema = validate_json_schema(json_schema)
+    if console_flush_interval is not None and console_flush_interval <= 0:
+        raise ValueError("console_flush_interval must be a positive number of seconds")
+    if console_overflow is not None:
+        if console_overflow not in ("drop", "summarize"):
+            raise ValueError("console_overflow must be None, 'drop' or 'summarize'")
+        if console_flush_interval is not None:
+            raise ValueError(
+                "console_overflow and console_flush_interval cannot be combined"
+            )
+    if highlight_patterns is not None:
+        highlight_patterns = validate_highlight_patterns(highlight_patterns)
+    if highlight_max_length is not None and (
+        not isinstance(highlight_max_length, int) or highlight_max_length < 0
+    ):
+        raise ValueError("highlight_max_length must be a non-negative integer")
+    if not isinstance(render_cache_size, int) or render_cache_size < 0:
+        raise ValueError("render_cache_size must be a non-negative integer")
+    if compression is not None and compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(
+            f"compression must be None or one of: {', '.join(COMPRESSION_EXTENSIONS)}"
+        )
+    if sinks is not None:
+        _validate_sinks(sinks)
+    if file_buffer_size is not None and (
+        not isinstance(file_buffer_size, int) or file_buffer_size <= 0
+    ):
+        raise ValueError("file_buffer_size must be a positive integer")
+    if file_index_every is not None and (
+        not isinstance(file_index_every, int) or file_index_every <= 0
+    ):
+        raise ValueError("file_index_every must be a positive integer")
+    for name, interval in (
+        ("file_flush_interval", file_flush_interval),
+        ("file_fsync_interval", file_fsync_interval),
+        ("file_index_interval", file_index_interval),
+    ):
+        if interval is not None and interval <= 0:
+            raise ValueError(f"{name} must be a positive number of seconds")
 
     root = logging.getLogger()
     root.setLevel(logging.NOTSET)
     _internal_logger.setLevel(logging.NOTSET)
     _internal_logger.propagate = True
 
+    _apply_levels(min_level, module_levels)
+    sink_levels = [
+        _coerce_level(sink.level) for sink in sinks or () if sink.level is not None
+    ]
+    logger_state["sink_level"] = min(sink_levels) if sink_levels else None
+    rich_configure_render_cache(render_cache_size)
+    install_resize_handler()
     logger_state.update(
         {
-            "min_level": min_level,
-            "level_by_module": module_levels,
             "rich_highlight": highlight,
             "env_extra": _load_env_extra(),
         }
     )
 
     console_handler = _build_console_handler(
-        log_verbose, rich_handler=rich_handler, serialize=serialize
+        log_verbose,
+        rich_handler=rich_handler,
+        serialize=serialize,
+        plain_console=plain_console,
+        json_text=serialize_text,
+        json_dumps=json_dumps,
+        json_schema=json_schema,
+        flush_interval=console_flush_interval,
+        overflow=console_overflow,
+        rich_compact=rich_compact,
+        highlight_patterns=highlight_patterns,
+        highlight_max_length=highlight_max_length,
     )
     final_handlers: list[logging.Handler] = [console_handler]
 
     log_path: Optional[str] = None
-    if log_filename is not None:
+    if log_filename is not None or sinks:
         log_dir = Path(log_folder)
         log_dir.mkdir(parents=True, exist_ok=True)
-        file_path = log_dir / log_filename
-        final_handlers.append(
-            _build_file_handler(
-                file_path,
-                log_verbose=log_verbose,
-                serialize=serialize,
-                rotation=rotation,
-                retention=retention,
-            )
+        renderer = LogurichRenderer(
+            log_verbose,
+            json_text=serialize_text,
+            json_dumps=json_dumps,
+            json_schema=json_schema,
         )
-        log_path = str(file_path.resolve())
+        formatters: dict[Optional[bool], LogurichFileFormatter] = {
+            flag: LogurichFileFormatter(renderer, serialize=flag)
+            for flag in (False, True)
+        }
+        formatters[None] = formatters[serialize]
+        file_options = {
+            "buffer_size": file_buffer_size,
+            "flush_interval": file_flush_interval,
+            "fsync_interval": file_fsync_interval,
+            "index_every": file_index_every,
+            "index_interval": file_index_interval,
+        }
+        routes: list[Route] = []
+        if log_filename is not None:
+            file_path = log_dir / log_filename
+            routes.append(
+                Route(
+                    _build_file_handler(
+                        file_path,
+                        formatter=formatters[serialize],
+                        rotation=rotation,
+                        retention=retention,
+                        retention_bytes=retention_bytes,
+                        compression=compression,
+                        **file_options,
+                    )
+                )
+            )
+            log_path = str(file_path.resolve())
+        for sink in sinks or ():
+            handler = _build_file_handler(
+                log_dir / sink.filename,
+                formatter=formatters[sink.serialize],
+                rotation=sink.rotation,
+                retention=sink.retention,
+                retention_bytes=sink.retention_bytes,
+                compression=sink.compression,
+                **file_options,
+            )
+            routes.append(_sink_route(sink, handler))
+        if sinks:
+            router = SinkRouter(routes, default_level=_resolve_level_for_record)
+            router.addFilter(_SINK_LEVEL_FILTER)
+            final_handlers.append(router)
+        else:
+            final_handlers.append(routes[0].handler)
 
     if enqueue:
-        queue = mp.Queue()
+        queue = LogurichQueue(ctx=mp.get_context(), shed_watermarks=shed_watermarks)
+        queue.publish_levels(min_level, module_levels, logger_state["sink_level"])
         queue_handler = _LogurichQueueHandler(queue)
         queue_handler.setLevel(logging.NOTSET)
         queue_handler.addFilter(_PRODUCER_FILTER)
         root.addHandler(queue_handler)
 
-        listener = logging.handlers.QueueListener(
+        listener = LogurichQueueListener(
             queue,
             *final_handlers,
             respect_handler_level=True,
+            reorder_window=reorder_window,
         )
         listener.start()
         logger_state.update(
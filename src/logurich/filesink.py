@@ -0,0 +1,493 @@
+"""File sink that formats each record once and rotates on size and/or time."""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import logging
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from datetime import time as datetime_time
+from logging import LogRecord
+from typing import BinaryIO, Literal, Optional, Union
+
+from .index import TimeIndexWriter, index_path
+
+DEFAULT_FILE_BUFFER_SIZE = 64 * 1024
+DEFAULT_FILE_FLUSH_INTERVAL = 1.0
+Compression = Literal["gzip", "bz2", "lzma"]
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "lzma": ".xz"}
+_DATE_SUFFIX = "%Y-%m-%d"
+_STAMP_SUFFIX = "%Y-%m-%d_%H-%M-%S"
+_COMPRESSED_RE = "|".join(re.escape(ext) for ext in COMPRESSION_EXTENSIONS.values())
+_NUMBERED_RE = re.compile(rf"^(\d+)({_COMPRESSED_RE})?$")
+_DATE_SUFFIX_RE = re.compile(
+    rf"^(\d{{4}}-\d{{2}}-\d{{2}})(?:-(\d+))?({_COMPRESSED_RE})?$"
+)
+_STAMP_SUFFIX_RE = re.compile(
+    rf"^(\d{{4}}-\d{{2}}-\d{{2}}_\d{{2}}-\d{{2}}-\d{{2}})(?:-(\d+))?"
+    rf"({_COMPRESSED_RE})?$"
+)
+
+
+@dataclass
+class _Backup:
+    """A rotated file tracked for retention, oldest first."""
+
+    path: str
+    size: int
+    rotated_at: float
+
+
+class LogurichFileHandler(logging.Handler):
+    """Append formatted records to a file, rotating on size and/or time.
+
+    Each record is formatted once and encoded to UTF-8, and the handler keeps
+    track of the file size itself. The stdlib ``RotatingFileHandler`` formats
+    every record a second time just to measure it.
+
+    The file is rotated once it would exceed ``max_bytes``, at the daily
+    ``at_time`` or every ``interval``, whichever comes first. Backups follow
+    the stdlib naming so existing log directories keep working: ``name.1`` to
+    ``name.N`` for size rotation alone and ``name.YYYY-MM-DD`` for daily
+    rotation alone. Other combinations name backups after the rollover time,
+    ``name.YYYY-MM-DD_HH-MM-SS``.
+
+    Backups are removed, oldest first, beyond ``backup_count`` files, beyond
+    ``max_backup_bytes`` in total, or once older than ``max_backup_age``.
+    The directory is scanned once when the handler is created; backups are
+    tracked in memory afterwards. As with the stdlib, size rotation alone is
+    disabled without any retention limit.
+
+    By default every record is flushed to the file as it is written. With a
+    ``buffer_size`` (bytes) or ``flush_interval`` (seconds), writes go through
+    a buffer of that size that is flushed once it is full, at most
+    ``flush_interval`` seconds after the first pending write, and right after
+    records at ``flush_level`` or above. ``fsync_interval`` (seconds)
+    additionally calls ``os.fsync`` on flush at most that often, and on
+    rollover and close.
+
+    With ``compression`` (``"gzip"``, ``"bz2"`` or ``"lzma"``), backups are
+    queued after the rollover and compressed one at a time by a background
+    thread, e.g. to ``name.1.gz``; rollovers never wait for it. Retention
+    limits count a backup at its compressed size once it is compressed.
+    ``close`` waits for the queued backups.
+
+    With ``index_every`` (records) or ``index_interval`` (seconds), a time
+    index of the file is written to ``name.idx`` (see :mod:`logurich.index`)
+    and moved, compressed and removed along with each backup.
+    """
+
+    terminator = "\n"
+    flush_level = logging.ERROR
+
+    def __init__(
+        self,
+        filename: Union[str, os.PathLike[str]],
+        *,
+        max_bytes: Optional[int] = None,
+        at_time: Optional[datetime_time] = None,
+        interval: Optional[timedelta] = None,
+        backup_count: int = 0,
+        max_backup_bytes: Optional[int] = None,
+        max_backup_age: Optional[timedelta] = None,
+        encoding: str = "utf-8",
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        fsync_interval: Optional[float] = None,
+        compression: Optional[Compression] = None,
+        index_every: Optional[int] = None,
+        index_interval: Optional[float] = None,
+    ) -> None:
+        if at_time is not None and interval is not None:
+            raise ValueError("at_time and interval cannot be combined")
+        if interval is not None and interval <= timedelta(0):
+            raise ValueError("interval must be a positive timedelta")
+        if compression is not None and compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(
+                "compression must be None or one of: "
+                f"{', '.join(COMPRESSION_EXTENSIONS)}"
+            )
+        if buffer_size is not None and buffer_size <= 0:
+            raise ValueError("buffer_size must be a positive number of bytes")
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError("flush_interval must be a positive number of seconds")
+        if fsync_interval is not None and fsync_interval <= 0:
+            raise ValueError("fsync_interval must be a positive number of seconds")
+        if index_every is not None and index_every <= 0:
+            raise ValueError("index_every must be a positive number of records")
+        if index_interval is not None and index_interval <= 0:
+            raise ValueError("index_interval must be a positive number of seconds")
+        super().__init__()
+        # Same attribute as the stdlib file handlers, for code inspecting them.
+        self.baseFilename = os.path.abspath(os.fspath(filename))
+        self.max_bytes = max_bytes
+        self.at_time = at_time
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_backup_bytes = max_backup_bytes
+        self.max_backup_age = max_backup_age
+        timed = at_time is not None or interval is not None
+        if timed and max_bytes is None and at_time is not None:
+            self._naming = "dated"
+        elif not timed:
+            self._naming = "numbered"
+        else:
+            self._naming = "stamped"
+        self._rotates_by_size = max_bytes is not None and (
+            self._naming != "numbered"
+            or backup_count > 0
+            or max_backup_bytes is not None
+            or max_backup_age is not None
+        )
+        self.encoding = encoding
+        self.buffered = buffer_size is not None or flush_interval is not None
+        self.buffer_size = buffer_size or DEFAULT_FILE_BUFFER_SIZE
+        self.flush_interval = flush_interval or DEFAULT_FILE_FLUSH_INTERVAL
+        self.fsync_interval = fsync_interval
+        self.compression = compression
+        self._extension = COMPRESSION_EXTENSIONS.get(compression, "")
+        self._compressor: Optional[threading.Thread] = None
+        self._compress_queue: queue.SimpleQueue[Optional[_Backup]] = queue.SimpleQueue()
+        self.index_every = index_every
+        self.index_interval = index_interval
+        self._index: Optional[TimeIndexWriter] = None
+        self._stream: Optional[BinaryIO] = None
+        self._size = 0
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backups: deque[_Backup] = deque()
+        self._backup_bytes = 0
+        self._open()
+        self._scan_backups()
+        self._rollover_at: Optional[float] = None
+        if timed:
+            start = (
+                os.stat(self.baseFilename).st_mtime
+                if os.path.exists(self.baseFilename)
+                else time.time()
+            )
+            self._rollover_at = (
+                start + interval.total_seconds()
+                if interval is not None
+                else self._next_rollover(start)
+            )
+
+    def _open(self) -> None:
+        buffering = self.buffer_size if self.buffered else -1
+        self._stream = open(self.baseFilename, "ab", buffering=buffering)  # noqa: SIM115
+        self._size = os.fstat(self._stream.fileno()).st_size
+        if self.index_every is not None or self.index_interval is not None:
+            self._index = TimeIndexWriter(
+                index_path(self.baseFilename),
+                every=self.index_every,
+                interval=self.index_interval,
+            )
+
+    def _close_stream(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._stream is None:
+            return
+        self._stream.flush()
+        if self.fsync_interval is not None:
+            os.fsync(self._stream.fileno())
+            self._last_fsync = time.monotonic()
+        self._stream.close()
+        self._stream = None
+        self._dirty = False
+
+    def _flush_locked(self) -> None:
+        if self._stream is None or not self._dirty:
+            return
+        self._stream.flush()
+        self._dirty = False
+        if self._index is not None:
+            self._index.flush()
+        if self.fsync_interval is not None:
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._stream.fileno())
+                self._last_fsync = now
+
+    def _next_rollover(self, now: float) -> float:
+        if self.interval is not None:
+            step = self.interval.total_seconds()
+            rollover_at = self._rollover_at
+            while rollover_at <= now:
+                rollover_at += step
+            return rollover_at
+        current = datetime.fromtimestamp(now)
+        candidate = datetime.combine(current.date(), self.at_time)
+        if candidate <= current:
+            candidate += timedelta(days=1)
+        return candidate.timestamp()
+
+    def should_rollover(self, size: int, now: float) -> bool:
+        """Return whether writing *size* more bytes at *now* needs a rollover."""
+
+        if self._rollover_at is not None and now >= self._rollover_at:
+            return True
+        return (
+            self._rotates_by_size
+            and self._size > 0
+            and self._size + size >= self.max_bytes
+        )
+
+    def do_rollover(self, now: Optional[float] = None) -> None:
+        """Close the current file, rename it to a backup and start a new one."""
+
+        if now is None:
+            now = time.time()
+        self._close_stream()
+        if os.path.exists(self.baseFilename):
+            size = self._size
+            self._expire_backups(now, size)
+            if self._naming == "numbered":
+                self._shift_numbered()
+            backup = _Backup(self._backup_path(now), size, now)
+            os.replace(self.baseFilename, backup.path)
+            _move_index(self.baseFilename, backup.path)
+            self._backups.append(backup)
+            self._backup_bytes += size
+            self._compress(backup)
+        if self._rollover_at is not None and now >= self._rollover_at:
+            self._rollover_at = self._next_rollover(now)
+        self._open()
+
+    def _backup_path(self, now: float) -> str:
+        base = self.baseFilename
+        if self._naming == "numbered":
+            return f"{base}.1"
+        if self._naming == "dated":
+            day = datetime.fromtimestamp(self._rollover_at) - timedelta(days=1)
+            return self._free_path(f"{base}.{day.strftime(_DATE_SUFFIX)}")
+        return self._free_path(
+            f"{base}.{datetime.fromtimestamp(now).strftime(_STAMP_SUFFIX)}"
+        )
+
+    def _free_path(self, path: str) -> str:
+        """Return *path*, or *path* with a ``-N`` counter if a backup uses it."""
+
+        candidate = path
+        counter = 0
+        while os.path.exists(candidate) or os.path.exists(
+            f"{candidate}{self._extension}"
+        ):
+            counter += 1
+            candidate = f"{path}-{counter}"
+        return candidate
+
+    def _shift_numbered(self) -> None:
+        prefix = f"{self.baseFilename}."
+        for backup in self._backups:
+            match = _NUMBERED_RE.match(backup.path[len(prefix) :])
+            path = f"{prefix}{int(match.group(1)) + 1}{match.group(2) or ''}"
+            os.replace(backup.path, path)
+            _move_index(backup.path, path)
+            backup.path = path
+
+    def _expire_backups(self, now: float, incoming: int) -> None:
+        """Remove the oldest backups so that one more of *incoming* bytes fits."""
+
+        backups = self._backups
+        min_rotated_at = (
+            now - self.max_backup_age.total_seconds()
+            if self.max_backup_age is not None
+            else None
+        )
+        while backups and (
+            (self.backup_count > 0 and len(backups) >= self.backup_count)
+            or (
+                self.max_backup_bytes is not None
+                and self._backup_bytes + incoming > self.max_backup_bytes
+            )
+            or (min_rotated_at is not None and backups[0].rotated_at < min_rotated_at)
+        ):
+            backup = backups.popleft()
+            self._backup_bytes -= backup.size
+            for path in (backup.path, index_path(backup.path)):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+    def _scan_backups(self) -> None:
+        directory, name = os.path.split(self.baseFilename)
+        prefix = f"{name}."
+        pattern = {
+            "numbered": _NUMBERED_RE,
+            "dated": _DATE_SUFFIX_RE,
+            "stamped": _STAMP_SUFFIX_RE,
+        }[self._naming]
+        found: list[tuple[tuple[object, ...], _Backup]] = []
+        for entry in os.scandir(directory):
+            if not entry.name.startswith(prefix) or not entry.is_file():
+                continue
+            match = pattern.match(entry.name[len(prefix) :])
+            if match is None:
+                continue
+            stat = entry.stat()
+            if self._naming == "numbered":
+                key: tuple[object, ...] = (-int(match.group(1)),)
+            else:
+                key = (match.group(1), int(match.group(2) or 0))
+            found.append((key, _Backup(entry.path, stat.st_size, stat.st_mtime)))
+        found.sort(key=lambda item: item[0])
+        self._backups.extend(backup for _, backup in found)
+        self._backup_bytes = sum(backup.size for backup in self._backups)
+
+    def _compress(self, backup: _Backup) -> None:
+        if self.compression is None:
+            return
+        self._compress_queue.put(backup)
+        if self._compressor is None or not self._compressor.is_alive():
+            self._compressor = threading.Thread(
+                target=self._run_compressor,
+                name="logurich-file-compressor",
+                daemon=True,
+            )
+            self._compressor.start()
+
+    def _tracked(self, backup: _Backup) -> bool:
+        return any(item is backup for item in self._backups)
+
+    def _run_compressor(self) -> None:
+        while True:
+            backup = self._compress_queue.get()
+            if backup is None:
+                return
+            self._compress_backup(backup)
+
+    def _compress_backup(self, backup: _Backup) -> None:
+        """Compress *backup* unless it expired, then account for its new size."""
+
+        partial = f"{self.baseFilename}{self._extension}.tmp"
+        try:
+            with self.lock:
+                if not self._tracked(backup):
+                    return
+                # Opened under the lock: a rollover may rename the backup later.
+                source = open(backup.path, "rb")  # noqa: SIM115
+            with source:
+                _compress_stream(source, partial, self.compression)
+            with self.lock:
+                if not self._tracked(backup):
+                    os.remove(partial)
+                    return
+                target = f"{backup.path}{self._extension}"
+                os.replace(partial, target)
+                _move_index(backup.path, target)
+                os.remove(backup.path)
+                size = os.path.getsize(target)
+                self._backup_bytes += size - backup.size
+                backup.path = target
+                backup.size = size
+        except Exception as exc:
+            # Keep the uncompressed backup; there is no record to report this on.
+            with contextlib.suppress(OSError):
+                os.remove(partial)
+            sys.stderr.write(f"logurich: could not compress {backup.path}: {exc}\n")
+
+    def _stop_compressor(self) -> None:
+        thread, self._compressor = self._compressor, None
+        if thread is not None:
+            self._compress_queue.put(None)
+            thread.join()
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+            return
+        self.emit_formatted(record, message)
+
+    def emit_formatted(self, record: LogRecord, message: str) -> None:
+        """Write *message*, already formatted from *record*, to the file."""
+
+        try:
+            data = (message + self.terminator).encode(self.encoding, "backslashreplace")
+            if self.should_rollover(len(data), time.time()):
+                self.do_rollover()
+            if self._stream is None:
+                self._open()
+            pending = self._dirty
+            self._stream.write(data)
+            if self._index is not None:
+                self._index.add(record.created, self._size, record.levelno)
+            self._size += len(data)
+            self._dirty = True
+            if not self.buffered or record.levelno >= self.flush_level:
+                self._flush_locked()
+            elif not pending:
+                self._ensure_thread()
+                self._wakeup.set()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Write pending output, stop the flush thread and close the file."""
+
+        self._stop.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+        # Outside the lock, which the compressor takes to finish each backup.
+        self._stop_compressor()
+        with self.lock:
+            try:
+                self._close_stream()
+            finally:
+                super().close()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="logurich-file-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stop.wait(self.flush_interval):
+                break
+            with self.lock:
+                self._flush_locked()
+
+
+def _compress_stream(source: BinaryIO, target: str, compression: str) -> None:
+    """Write the compressed content of *source* to *target*."""
+
+    module = importlib.import_module(compression)
+    with module.open(target, "wb") as output:
+        shutil.copyfileobj(source, output, 1024 * 1024)
+
+
+def _move_index(source: str, target: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.replace(index_path(source), index_path(target))
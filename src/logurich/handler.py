@@ -2,58 +2,131 @@
 
 from __future__ import annotations
 
-import json
-import logging
-from datetime import datetime, timedelta
-from logging import Formatter, Handler, LogRecord
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from logging import ERROR, Formatter, Handler, LogRecord
 from pathlib import Path
-from time import perf_counter
-from typing import TYPE_CHECKING, Any, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from rich.console import ConsoleRenderable
-from rich.highlighter import ReprHighlighter
+from rich.emoji import Emoji
+from rich.highlighter import Highlighter, ReprHighlighter
 from rich.logging import RichHandler
 from rich.pretty import Pretty
+from rich.style import Style
 from rich.table import Table
 from rich.text import Text
 
-from .console import rich_console_renderer, rich_get_console, rich_to_str
+from .console import (
+    PrefixedLines,
+    rich_console_renderer,
+    rich_get_console,
+    rich_to_str,
+)
+from .serialization import JsonDumps, JsonSerializer
 from .struct import logger_state
+from .utils import context_display_name
+from .writer import ConsoleWriter
 
 if TYPE_CHECKING:
     from rich.console import Console, RenderableType
 
 DEFAULT_CONTENT_PADDING = (0, 10, 22, 25)
-SERIALIZATION_START = perf_counter()
-STANDARD_LOG_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__)
-LOGURICH_INTERNAL_RECORD_ATTRS = frozenset(
-    {
-        "_logurich_prepared",
-        "context",
-        "end",
-        "exception_data",
-        "formatted_exception",
-        "message",
-        "render_prefix",
-        "render_width",
-        "renderables",
-        "rich_highlight",
-        "rich_traceback",
-    }
-)
+PREFIX_CACHE_MAX_SIZE = 1024
 
 
 def _safe_text_from_markup(value: str) -> Text:
-    try:
-        return Text.from_markup(value)
-    except Exception:
-        return Text(value)
+    # Only markup tags need the parser; emoji codes are replaced directly.
+    if "[" in value:
+        try:
+            return Text.from_markup(value)
+        except Exception:
+            return Text(value)
+    if ":" in value:
+        return Text(Emoji.replace(value))
+    return Text(value)
+
+
+def _plain_from_markup(value: str) -> str:
+    if "[" in value:
+        return _safe_text_from_markup(value).plain
+    if ":" in value:
+        return Emoji.replace(value)
+    return value
+
+
+class TimestampCache:
+    """Per-second cache of formatted local timestamps.
+
+    The date/time text, ISO-8601 base, UTC offset and ``datetime`` of the
+    current second are rebuilt only when the second changes; sub-second parts
+    are spliced in per record.
+    """
+
+    __slots__ = ("_entry",)
+
+    def __init__(self) -> None:
+        self._entry: tuple[Any, ...] = (None, "", "", "", None)
+
+    @staticmethod
+    def _split(created: float) -> tuple[int, int]:
+        # Same rounding as ``datetime.fromtimestamp``.
+        second = int(created)
+        micro = round((created - second) * 1_000_000)
+        if micro >= 1_000_000:
+            second += 1
+            micro -= 1_000_000
+        return second, micro
+
+    def _entry_for(self, second: int) -> tuple[Any, ...]:
+        entry = self._entry
+        if entry[0] == second:
+            return entry
+        local = time.localtime(second)
+        date_text = f"{local.tm_year:04d}-{local.tm_mon:02d}-{local.tm_mday:02d}"
+        time_text = f"{local.tm_hour:02d}:{local.tm_min:02d}:{local.tm_sec:02d}"
+        offset = local.tm_gmtoff
+        sign = "-" if offset < 0 else "+"
+        hours, remainder = divmod(abs(offset), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        offset_text = f"{sign}{hours:02d}:{minutes:02d}"
+        if seconds:
+            offset_text = f"{offset_text}:{seconds:02d}"
+        entry = (
+            second,
+            f"{date_text} {time_text}",
+            f"{date_text}T{time_text}",
+            offset_text,
+            datetime.fromtimestamp(second),
+        )
+        self._entry = entry
+        return entry
+
+    def prefix(self, created: float) -> str:
+        """Return ``YYYY-MM-DD HH:MM:SS.mmm`` in local time."""
 
+        second, micro = self._split(created)
+        return f"{self._entry_for(second)[1]}.{micro // 1000:03d}"
 
-def _context_display_name(name: str) -> str:
-    if name.startswith("context::"):
-        return name.split("::", 1)[1]
-    return name
+    def isoformat(self, created: float) -> str:
+        """Return the local ISO-8601 timestamp including the UTC offset."""
+
+        second, micro = self._split(created)
+        entry = self._entry_for(second)
+        if micro:
+            return f"{entry[2]}.{micro:06d}{entry[3]}"
+        return f"{entry[2]}{entry[3]}"
+
+    def local_datetime(self, created: float) -> datetime:
+        """Return the naive local ``datetime`` for *created*."""
+
+        second, micro = self._split(created)
+        base = self._entry_for(second)[4]
+        return base.replace(microsecond=micro) if micro else base
+
+
+TIMESTAMPS = TimestampCache()
 
 
 class LogurichRenderer:
@@ -67,15 +140,27 @@ class LogurichRenderer:
         "CRITICAL": "bold white on red",
     }
 
-    def __init__(self, verbose: int) -> None:
+    def __init__(
+        self,
+        verbose: int,
+        *,
+        json_text: bool = True,
+        json_dumps: Optional[JsonDumps] = None,
+        json_schema: Optional[Mapping[str, str]] = None,
+    ) -> None:
         self.verbose = max(0, min(verbose, 3))
         self.base_padding = DEFAULT_CONTENT_PADDING[self.verbose]
+        self.timestamps = TIMESTAMPS
+        self.json = JsonSerializer(
+            self, text=json_text, dumps=json_dumps, schema=json_schema
+        )
+        self._prefix_cache: dict[tuple[str, str], tuple[str, str, Text]] = {}
 
     def build_context(self, record: LogRecord, *, is_rich_handler: bool) -> list[str]:
         list_context: list[str] = []
         context = getattr(record, "context", {}) or {}
         for name, value in context.items():
-            display_name = _context_display_name(name)
+            display_name = context_display_name(name)
             if hasattr(value, "render"):
                 list_context.append(
                     value.render(display_name, is_rich_handler=is_rich_handler)
@@ -84,30 +169,92 @@ class LogurichRenderer:
                 list_context.append(f"[{display_name}={value}]")
         return list_context
 
-    def build_prefix(self, record: LogRecord) -> str:
-        time_text = datetime.fromtimestamp(record.created).strftime(
-            "%Y-%m-%d %H:%M:%S.%f"
-        )[:-3]
+    def build_context_plain(self, record: LogRecord) -> str:
+        parts: list[str] = []
+        context = getattr(record, "context", {}) or {}
+        for name, value in context.items():
+            display_name = context_display_name(name)
+            if hasattr(value, "render_plain"):
+                parts.append(value.render_plain(display_name))
+            else:
+                parts.append(f"[{display_name}={value}]")
+        return "".join(parts)
+
+    def format_time(self, created: float) -> str:
+        return self.timestamps.prefix(created)
+
+    def _prefix_segments(self, record: LogRecord) -> tuple[str, str, Text]:
+        """Return the cached plain, markup and styled prefix after the time."""
+
         level = record.levelname
-        level_color = self.LEVEL_COLOR_MAP.get(level, "cyan")
         source = self._source_label(record)
-        if not source:
-            return f"{time_text} | [{level_color}]{level:<8}[/{level_color}] | "
-        target_padding = min(max(self.base_padding, len(source)), 50)
-        padding = " " * max(0, target_padding - len(source))
+        key = (level, source)
+        segments = self._prefix_cache.get(key)
+        if segments is not None:
+            return segments
+
+        level_color = self.LEVEL_COLOR_MAP.get(level, "cyan")
+        if source:
+            target_padding = min(max(self.base_padding, len(source)), 50)
+            source_text = f"{source:<{target_padding}} | "
+        else:
+            source_text = ""
+        styled = Text(" | ")
+        styled.append(f"{level:<8}", style=level_color)
+        styled.append(f" | {source_text}")
+        segments = (
+            f" | {level:<8} | {source_text}",
+            f" | [{level_color}]{level:<8}[/{level_color}] | {source_text}",
+            styled,
+        )
+        if len(self._prefix_cache) >= PREFIX_CACHE_MAX_SIZE:
+            self._prefix_cache.clear()
+        self._prefix_cache[key] = segments
+        return segments
+
+    def build_prefix(self, record: LogRecord) -> str:
+        return f"{self.format_time(record.created)}{self._prefix_segments(record)[1]}"
+
+    def build_prefix_plain(self, record: LogRecord) -> str:
+        return f"{self.format_time(record.created)}{self._prefix_segments(record)[0]}"
+
+    def build_prefix_text(self, record: LogRecord) -> Text:
+        text = Text(self.format_time(record.created))
+        text.append_text(self._prefix_segments(record)[2])
+        return text
+
+    def message_text(self, record: LogRecord) -> Text:
+        """Return the message as ``Text``, honouring ``record.markup``."""
+
+        message = record.getMessage()
+        if getattr(record, "markup", True) is False:
+            return Text(message)
+        return _safe_text_from_markup(message)
+
+    def message_plain(self, record: LogRecord) -> str:
+        """Return the message with markup stripped, honouring ``record.markup``."""
+
+        message = record.getMessage()
+        if getattr(record, "markup", True) is False:
+            return message
+        return _plain_from_markup(message)
+
+    def format_plain_line(self, record: LogRecord) -> str:
+        """Render the prefix, context and message line without Rich objects."""
+
+        context_plain = self.build_context_plain(record)
+        message_plain = self.message_plain(record)
         return (
-            f"{time_text} | [{level_color}]{level:<8}[/{level_color}] | "
-            f"{source}{padding} | "
+            f"{self.build_prefix_plain(record)}"
+            f"{context_plain}{' ' if context_plain else ''}{message_plain}"
         )
 
     def format_file(self, record: LogRecord) -> str:
-        prefix_markup = self.build_prefix(record)
-        prefix_plain = _safe_text_from_markup(prefix_markup).plain
-        context_markup = "".join(self.build_context(record, is_rich_handler=False))
-        context_plain = _safe_text_from_markup(
-            context_markup + (" " if context_markup else "")
-        ).plain
-        message_plain = _safe_text_from_markup(record.getMessage()).plain
+        prefix_plain = self.build_prefix_plain(record)
+        context_plain = self.build_context_plain(record)
+        if context_plain:
+            context_plain = f"{context_plain} "
+        message_plain = self.message_plain(record)
         exception_text = getattr(record, "formatted_exception", "").rstrip("\n")
 
         parts: list[str] = []
@@ -120,96 +267,29 @@ class LogurichRenderer:
         renderables = self._renderables(record)
         if renderables:
             rendered = rich_console_renderer(
-                prefix_markup,
+                self.build_prefix(record),
                 getattr(record, "render_prefix", True),
                 renderables,
                 getattr(record, "render_width", None),
+                getattr(record, "render_cache_key", None),
             )
-            parts.append(
-                rich_to_str(
-                    *rendered,
-                    ansi=False,
-                    width=getattr(record, "render_width", None),
-                ).rstrip("\n")
-            )
+            if all(isinstance(item, PrefixedLines) for item in rendered):
+                parts.append("\n".join(item.plain() for item in rendered))
+            else:
+                parts.append(
+                    rich_to_str(
+                        *rendered,
+                        ansi=False,
+                        width=getattr(record, "render_width", None),
+                    ).rstrip("\n")
+                )
         elif exception_text and not parts:
             parts.append(exception_text)
 
         return "\n".join(part for part in parts if part)
 
     def format_json(self, record: LogRecord) -> str:
-        text = self.format_file(record)
-        end = getattr(record, "end", "\n")
-        rendered_text = f"{text}{end}" if text else ""
-        extra = self._serialize_extra(record)
-        created_at = datetime.fromtimestamp(record.created).astimezone()
-        exception_data = getattr(record, "exception_data", None)
-        file_path = str(Path(record.pathname))
-        elapsed_seconds = perf_counter() - SERIALIZATION_START
-        renderables = self._renderables(record)
-        message_value = record.getMessage()
-        if renderables and text:
-            lines = text.splitlines()
-            continuation = "\n".join(lines[1:])
-            if continuation:
-                message_value = f"{message_value}\n{continuation}"
-        payload = {
-            "text": rendered_text,
-            "record": {
-                "elapsed": {
-                    "repr": str(timedelta(seconds=elapsed_seconds)),
-                    "seconds": round(elapsed_seconds, 6),
-                },
-                "exception": exception_data,
-                "extra": extra,
-                "file": {
-                    "name": Path(record.pathname).name,
-                    "path": file_path,
-                },
-                "function": record.funcName,
-                "level": {
-                    "name": record.levelname,
-                    "no": record.levelno,
-                },
-                "line": record.lineno,
-                "message": message_value,
-                "module": record.module,
-                "name": record.name,
-                "process": {
-                    "id": record.process,
-                    "name": record.processName,
-                },
-                "thread": {
-                    "id": record.thread,
-                    "name": record.threadName,
-                },
-                "time": {
-                    "repr": created_at.isoformat(),
-                    "timestamp": record.created,
-                },
-            },
-        }
-        return json.dumps(payload, default=str, ensure_ascii=False)
-
-    def _serialize_extra(self, record: LogRecord) -> dict[str, Any]:
-        context = getattr(record, "context", {}) or {}
-        serialized = dict(logger_state.get("env_extra", {}))
-        user_extra = {
-            key: value
-            for key, value in record.__dict__.items()
-            if key not in STANDARD_LOG_RECORD_ATTRS
-            and key not in LOGURICH_INTERNAL_RECORD_ATTRS
-            and not key.startswith("_logurich_")
-        }
-        if user_extra:
-            serialized.update(user_extra)
-        serialized.update(
-            {
-                _context_display_name(key): getattr(value, "value", value)
-                for key, value in context.items()
-            }
-        )
-        return serialized
+        return self.json.serialize(record)
 
     def _renderables(self, record: LogRecord) -> tuple[Any, ...]:
         renderables = getattr(record, "renderables", ()) or ()
@@ -247,14 +327,81 @@ class LogurichFileFormatter(Formatter):
 
 
 class CustomRichHandler(RichHandler):
-    """Rich-formatted handler using standard log records."""
+    """Rich-formatted handler using standard log records.
+
+    With ``compact``, single-line messages without renderables or tracebacks
+    are rendered as one pre-styled :class:`~rich.text.Text` line instead of
+    nested table grids. Other records keep the grid layout. With a
+    ``writer``, each record is rendered into a string and handed to it, as
+    in :class:`CustomHandler`.
+    """
+
+    CONTEXT_SEPARATOR = " \u25b6  "
+    flush_level = ERROR
 
     def __init__(
-        self, renderer: LogurichRenderer, *args: object, **kwargs: object
+        self,
+        renderer: LogurichRenderer,
+        *args: object,
+        compact: bool = False,
+        highlight_max_length: Optional[int] = None,
+        writer: Optional[ConsoleWriter] = None,
+        **kwargs: object,
     ) -> None:
         self.renderer = renderer
+        self.compact = compact
+        self.highlight_max_length = highlight_max_length
+        self.writer = writer
+        self._compact_time: Optional[tuple[int, Any, Text]] = None
+        self._compact_styles: Optional[dict[str, Style]] = None
+        # Time text of the last record shown, for ``omit_repeated_times``.
+        self._last_time_text: Optional[Text] = None
         super().__init__(*args, console=rich_get_console(), **kwargs)
 
+    def emit(self, record: LogRecord) -> None:
+        writer = self.writer
+        if writer is None:
+            super().emit(record)
+            return
+        try:
+            message = self.format(record)
+            if record.exc_info and record.exc_info != (None, None, None):
+                # The traceback is rendered from ``record.rich_traceback``.
+                record.message = record.getMessage()
+                formatter = self.formatter
+                message = (
+                    formatter.formatMessage(record) if formatter else record.message
+                )
+            renderable = self.render(
+                record=record,
+                traceback=None,
+                message_renderable=self.render_message(record, message),
+            )
+            # Rendered off-screen: the console stream is only touched by the writer.
+            writer.write(rich_to_str(renderable))
+            if record.levelno >= self.flush_level:
+                writer.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        super().close()
+
+    def render_message(self, record: LogRecord, message: str) -> ConsoleRenderable:
+        if (
+            self.highlight_max_length is None
+            or len(message) <= self.highlight_max_length
+        ):
+            return super().render_message(record, message)
+        use_markup = getattr(record, "markup", self.markup)
+        return Text.from_markup(message) if use_markup else Text(message)
+
     def build_content(self, record: LogRecord, content: RenderableType) -> Table:
         row: list[Union[str, RenderableType]] = []
         list_context = self.renderer.build_context(record, is_rich_handler=True)
@@ -278,10 +425,18 @@ class CustomRichHandler(RichHandler):
     ) -> RenderableType:
         path = Path(record.pathname).name
         level = self.get_level_text(record)
-        time_format = None if self.formatter is None else self.formatter.datefmt
-        log_time = datetime.fromtimestamp(record.created)
         rich_tb = getattr(record, "rich_traceback", None)
         renderables = list(self.renderer._renderables(record))
+        if (
+            self.compact
+            and traceback is None
+            and rich_tb is None
+            and not renderables
+            and isinstance(message_renderable, Text)
+            and record.getMessage()
+            and "\n" not in message_renderable.plain
+        ):
+            return self._render_compact(record, message_renderable, path)
         output: list[RenderableType] = []
 
         if record.getMessage():
@@ -294,75 +449,241 @@ class CustomRichHandler(RichHandler):
         if rich_tb is not None:
             output.append(rich_tb)
 
+        time_display = (
+            self._time_display(record) if self._log_render.show_time else Text()
+        )
         return self._log_render(
             self.console,
             output,
-            log_time=log_time,
-            time_format=time_format,
+            log_time=self.renderer.timestamps.local_datetime(record.created),
+            time_format=lambda log_time: time_display,
             level=level,
             path=path,
             line_no=record.lineno,
             link_path=record.pathname if self.enable_link_path else None,
         )
 
+    def _styles(self) -> dict[str, Style]:
+        if self._compact_styles is None:
+            get_style = self.console.get_style
+            self._compact_styles = {
+                name: get_style(name, default="")
+                for name in ("log.time", "log.message", "log.path")
+            }
+            self._compact_styles["context"] = Style(bold=True)
+        return self._compact_styles
+
+    def _time_text(self, record: LogRecord) -> Text:
+        time_format = (
+            None if self.formatter is None else self.formatter.datefmt
+        ) or self._log_render.time_format
+        second = int(record.created)
+        cached = self._compact_time
+        if cached is None or cached[0] != second or cached[1] != time_format:
+            log_time = self.renderer.timestamps.local_datetime(record.created)
+            if callable(time_format):
+                time_text = time_format(log_time)
+            else:
+                time_text = Text(log_time.strftime(time_format))
+            cached = self._compact_time = (second, time_format, time_text)
+        return cached[2]
+
+    def _time_display(self, record: LogRecord) -> Text:
+        """Return the time column text, blank when it repeats the last one."""
+
+        time_text = self._time_text(record)
+        if self._log_render.omit_repeated_times and time_text == self._last_time_text:
+            return Text(" " * len(time_text))
+        self._last_time_text = time_text
+        return time_text
+
+    def _render_compact(self, record: LogRecord, message: Text, path: str) -> Text:
+        styles = self._styles()
+        log_render = self._log_render
+        line = Text()
+        if log_render.show_time:
+            line.append_text(self._time_display(record))
+            line.append(" ")
+            line.stylize_before(styles["log.time"], 0, len(line))
+        if log_render.show_level:
+            line.append_text(self.get_level_text(record))
+            line.append(" ")
+
+        list_context = self.renderer.build_context(record, is_rich_handler=True)
+        if list_context:
+            start = len(line)
+            line.append_text(_safe_text_from_markup(".".join(list_context)))
+            line.append(self.CONTEXT_SEPARATOR)
+            line.stylize_before(styles["context"], start, len(line))
+        start = len(line)
+        line.append_text(message)
+        line.stylize_before(styles["log.message"], start, len(line))
+
+        if log_render.show_path and path:
+            location = Text(path)
+            if record.lineno:
+                location.append(f":{record.lineno}")
+            if self.enable_link_path:
+                link = f"file://{record.pathname}"
+                location.stylize(f"link {link}", 0, len(path))
+                if record.lineno:
+                    location.stylize(
+                        f"link {link}#{record.lineno}", len(path) + 1, len(location)
+                    )
+            location.stylize_before(styles["log.path"])
+            gap = self.console.width - line.cell_len - location.cell_len
+            line.append(" " * max(1, gap))
+            line.append_text(location)
+        return line
+
 
 class CustomHandler(Handler):
-    """Console handler for logurich's standard and serialized outputs."""
+    """Console handler for logurich's standard and serialized outputs.
+
+    ``plain`` selects the Rich-free output path, which writes preformatted
+    strings straight to the console stream and only uses Rich to render
+    ``renderables``. ``None`` enables it automatically whenever the console
+    would not emit any styling, e.g. when stdout is a pipe.
+
+    With a ``writer``, the output of each record is rendered into a single
+    string and handed to it: a :class:`BufferedConsoleWriter` batches console
+    writes, a :class:`NonBlockingConsoleWriter` writes from its own thread.
+    Records at ``flush_level`` or above are flushed at once.
+    """
+
+    flush_level = ERROR
 
-    def __init__(self, renderer: LogurichRenderer, *, serialize: bool = False) -> None:
+    def __init__(
+        self,
+        renderer: LogurichRenderer,
+        *,
+        serialize: bool = False,
+        plain: Optional[bool] = None,
+        writer: Optional[ConsoleWriter] = None,
+        highlighter: Optional[Highlighter] = None,
+        highlight_max_length: Optional[int] = None,
+    ) -> None:
         super().__init__()
         self.renderer = renderer
-        self.highlighter = ReprHighlighter()
+        self.highlighter = highlighter if highlighter is not None else ReprHighlighter()
+        self.highlight_max_length = highlight_max_length
         self.serialize = serialize
+        self.plain = plain
+        self.writer = writer
         self._console: Console = rich_get_console()
 
-    def _should_highlight(self, record: LogRecord) -> bool:
+    def _should_highlight(self, record: LogRecord, message: Text) -> bool:
+        if (
+            self.highlight_max_length is not None
+            and len(message) > self.highlight_max_length
+        ):
+            return False
         return bool(getattr(record, "rich_highlight", False)) or bool(
             logger_state.get("rich_highlight")
         )
 
+    def _use_plain(self) -> bool:
+        if self.plain is not None:
+            return self.plain
+        console = self._console
+        return (
+            console.color_system is None
+            and not console.record
+            and not console.is_jupyter
+        )
+
+    def _write(self, text: str) -> None:
+        if self.writer is not None:
+            self.writer.write(text)
+            return
+        stream = self._console.file
+        stream.write(text)
+        stream.flush()
+
+    def flush(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        super().close()
+
+    def _print(self, *objects: Any, out: bool = False, **kwargs: Any) -> None:
+        console = self._console
+        if self.writer is None:
+            (console.out if out else console.print)(*objects, **kwargs)
+            return
+        # Rendered off-screen: leaving a capture of the shared console would
+        # write to its stream, which the writer exists to keep off this thread.
+        if out:
+            kwargs.update(
+                markup=False, emoji=False, no_wrap=True, overflow="ignore", crop=False
+            )
+            objects = (" ".join(str(item) for item in objects),)
+        self.writer.write(rich_to_str(*objects, **kwargs))
+
     def emit(self, record: LogRecord) -> None:
-        end = getattr(record, "end", "\n")
         try:
-            if self.serialize:
-                payload = self.renderer.format_json(record)
-                self._console.out(payload, highlight=False, end=end)
-                return
+            self._emit_record(record)
+            if self.writer is not None and record.levelno >= self.flush_level:
+                self.writer.flush()
+        except Exception:
+            self.handleError(record)
+
+    def _emit_record(self, record: LogRecord) -> None:
+        end = getattr(record, "end", "\n")
+        plain = self._use_plain()
+        if self.serialize:
+            payload = self.renderer.format_json(record)
+            if plain:
+                self._write(f"{payload}{end}")
+            else:
+                self._print(payload, out=True, highlight=False, end=end)
+            return
+
+        if plain:
+            self._emit_plain(record, end)
+        else:
+            self._emit_rich(record, end)
+
+        renderables = self.renderer._renderables(record)
+        if renderables:
+            rendered = rich_console_renderer(
+                self.renderer.build_prefix(record),
+                getattr(record, "render_prefix", True),
+                renderables,
+                getattr(record, "render_width", None),
+                getattr(record, "render_cache_key", None),
+            )
+            self._print(*rendered, end=end, highlight=False)
 
-            prefix = self.renderer.build_prefix(record)
+    def _emit_plain(self, record: LogRecord, end: str) -> None:
+        exception_text = getattr(record, "formatted_exception", "").rstrip("\n")
+        if record.getMessage():
+            line = self.renderer.format_plain_line(record)
+            if exception_text:
+                line = f"{line}\n{exception_text}"
+            self._write(f"{line}{end}")
+        elif exception_text:
+            self._write(f"{exception_text}{end}")
+
+    def _emit_rich(self, record: LogRecord, end: str) -> None:
+        exception_text = getattr(record, "formatted_exception", "").rstrip("\n")
+        if record.getMessage():
             list_context = self.renderer.build_context(record, is_rich_handler=False)
-            renderables = self.renderer._renderables(record)
-            exception_text = getattr(record, "formatted_exception", "").rstrip("\n")
-
-            if record.getMessage():
-                output_text = _safe_text_from_markup(prefix)
-                if list_context:
-                    output_text.append_text(
-                        _safe_text_from_markup("".join(list_context) + " ")
-                    )
-                message_text = _safe_text_from_markup(record.getMessage())
-                if self._should_highlight(record):
-                    message_text = self.highlighter(message_text)
-                output_text.append_text(message_text)
-                if exception_text:
-                    output_text.append("\n")
-                    output_text.append_text(Text(exception_text))
-                self._console.print(
-                    output_text,
-                    end=end,
-                    highlight=False,
-                    soft_wrap=True,
-                )
-            elif exception_text:
-                self._console.print(Text(exception_text), end=end, highlight=False)
-
-            if renderables:
-                rendered = rich_console_renderer(
-                    prefix,
-                    getattr(record, "render_prefix", True),
-                    renderables,
-                    getattr(record, "render_width", None),
+            output_text = self.renderer.build_prefix_text(record)
+            if list_context:
+                output_text.append_text(
+                    _safe_text_from_markup("".join(list_context) + " ")
                 )
-                self._console.print(*rendered, end=end, highlight=False)
-        except Exception:
-            self.handleError(record)
+            message_text = self.renderer.message_text(record)
+            if self._should_highlight(record, message_text):
+                message_text = self.highlighter(message_text)
+            output_text.append_text(message_text)
+            if exception_text:
+                output_text.append("\n")
+                output_text.append_text(Text(exception_text))
+            self._print(output_text, end=end, highlight=False, soft_wrap=True)
+        elif exception_text:
+            self._print(Text(exception_text), end=end, highlight=False)
@@ -0,0 +1,80 @@
+"""Selectable message highlighting compiled into a single regex."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Optional
+
+from rich.highlighter import Highlighter
+from rich.text import Text
+
+# Alternatives are tried in this order, so more specific patterns come first.
+HIGHLIGHT_PATTERNS: dict[str, tuple[str, ...]] = {
+    "urls": (r"(?P<url>(file|https|http|ws|wss)://[-0-9a-zA-Z$_+!`(),.?/;:&=%#~@]*)",),
+    "uuids": (
+        r"(?P<uuid>[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}"
+        r"-[a-fA-F0-9]{12})",
+    ),
+    "ips": (
+        r"(?P<ipv4>[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})",
+        r"(?P<ipv6>([A-Fa-f0-9]{1,4}::?){1,7}[A-Fa-f0-9]{1,4})",
+    ),
+    "paths": (r"(?P<path>\B(/[-\w._+]+)*\/)(?P<filename>[-\w._+]*)?",),
+    "booleans": (
+        r"\b(?P<bool_true>True)\b|\b(?P<bool_false>False)\b|\b(?P<none>None)\b",
+    ),
+    "numbers": (
+        r"(?P<number>(?<!\w)\-?[0-9]+\.?[0-9]*(e[-+]?\d+?)?\b|0x[0-9a-fA-F]*)",
+    ),
+}
+
+
+class PatternHighlighter(Highlighter):
+    """Highlight a selection of ``repr.*`` patterns in one regex pass.
+
+    Unlike Rich's ``ReprHighlighter``, which runs each of its patterns over
+    the text, the selected patterns are combined into a single alternation
+    compiled once per selection.
+    """
+
+    base_style = "repr."
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = validate_highlight_patterns(patterns)
+        self._regex = _compile(self.patterns)
+
+    def highlight(self, text: Text) -> None:
+        if self._regex is None:
+            return
+        base_style = self.base_style
+        stylize = text.stylize
+        for match in self._regex.finditer(text.plain):
+            for name, value in match.groupdict().items():
+                if value:
+                    start, end = match.span(name)
+                    stylize(f"{base_style}{name}", start, end)
+
+
+def validate_highlight_patterns(patterns: Iterable[str]) -> tuple[str, ...]:
+    """Return *patterns* in matching order, rejecting unknown names."""
+
+    if isinstance(patterns, str):
+        patterns = (patterns,)
+    selected = set(patterns)
+    unknown = selected.difference(HIGHLIGHT_PATTERNS)
+    if unknown:
+        raise ValueError(
+            f"Unknown highlight pattern(s) {', '.join(sorted(unknown))}, "
+            f"expected any of: {', '.join(HIGHLIGHT_PATTERNS)}"
+        )
+    return tuple(name for name in HIGHLIGHT_PATTERNS if name in selected)
+
+
+@lru_cache(maxsize=32)
+def _compile(patterns: tuple[str, ...]) -> Optional[re.Pattern[str]]:
+    alternatives = [regex for name in patterns for regex in HIGHLIGHT_PATTERNS[name]]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
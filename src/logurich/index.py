@@ -0,0 +1,160 @@
+"""Sidecar time index for log files written by the file sink.
+
+An index file ``<log>.idx`` starts with an 8-byte header followed by
+fixed-size little-endian entries, one per block of consecutive records:
+the earliest and latest record timestamps of the block, the byte offset of
+its first record, and its record count per level. A block ends at the next
+entry's offset, or at the end of the file for the last one. The index of a
+compressed backup is renamed along with it; its offsets refer to the
+decompressed content.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Union
+
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = b"LGRIDX\x00\x01"
+INDEX_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_ENTRY = struct.Struct(f"<ddQ{len(INDEX_LEVELS)}I")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """A block of consecutive records in a log file."""
+
+    first_time: float
+    last_time: float
+    offset: int
+    counts: tuple[int, ...]
+
+    def level_counts(self) -> dict[str, int]:
+        return dict(zip(INDEX_LEVELS, self.counts))
+
+
+def _level_slot(levelno: int) -> int:
+    return min(max(levelno // 10 - 1, 0), len(INDEX_LEVELS) - 1)
+
+
+def index_path(log_path: Union[str, os.PathLike[str]]) -> str:
+    """Return the sidecar index path of *log_path*."""
+
+    return f"{os.fspath(log_path)}{INDEX_SUFFIX}"
+
+
+class TimeIndexWriter:
+    """Append an index entry every ``every`` records or ``interval`` seconds."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        every: Optional[int] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self._stream: BinaryIO = open(path, "ab")  # noqa: SIM115
+        size = self._stream.tell()
+        if size == 0:
+            self._stream.write(INDEX_HEADER)
+        elif (size - len(INDEX_HEADER)) % _ENTRY.size:
+            # Drop an entry left half-written by a crash to stay aligned.
+            self._stream.truncate(size - (size - len(INDEX_HEADER)) % _ENTRY.size)
+        self._counts = [0] * len(INDEX_LEVELS)
+        self._records = 0
+        self._offset = 0
+        self._first = 0.0
+        self._last = 0.0
+        self._started = 0.0
+
+    def add(self, created: float, offset: int, levelno: int) -> None:
+        """Account for a record written at *offset*."""
+
+        if self._records == 0:
+            self._offset = offset
+            self._first = self._last = created
+            self._started = time.monotonic()
+        elif created < self._first:
+            self._first = created
+        elif created > self._last:
+            self._last = created
+        self._counts[_level_slot(levelno)] += 1
+        self._records += 1
+        if (self.every is not None and self._records >= self.every) or (
+            self.interval is not None
+            and time.monotonic() - self._started >= self.interval
+        ):
+            self._write_entry()
+
+    def _write_entry(self) -> None:
+        if self._records == 0:
+            return
+        self._stream.write(
+            _ENTRY.pack(self._first, self._last, self._offset, *self._counts)
+        )
+        self._counts = [0] * len(INDEX_LEVELS)
+        self._records = 0
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+    def close(self) -> None:
+        """Write the entry of the pending block and close the index file."""
+
+        self._write_entry()
+        self._stream.close()
+
+
+def read_index(log_path: Union[str, os.PathLike[str]]) -> list[IndexEntry]:
+    """Return the index entries of *log_path*, or an empty list without index."""
+
+    try:
+        with open(index_path(log_path), "rb") as stream:
+            data = stream.read()
+    except FileNotFoundError:
+        return []
+    if not data.startswith(INDEX_HEADER):
+        raise ValueError(f"{index_path(log_path)} is not a logurich index file")
+    body = memoryview(data)[len(INDEX_HEADER) :]
+    # A truncated trailing entry (e.g. after a crash) is ignored.
+    body = body[: len(body) - len(body) % _ENTRY.size]
+    return [
+        IndexEntry(first, last, offset, tuple(counts))
+        for first, last, offset, *counts in _ENTRY.iter_unpack(body)
+    ]
+
+
+def find_time_range(
+    entries: list[IndexEntry],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> tuple[int, Optional[int]]:
+    """Return the byte range ``[first, last)`` holding records in ``[start, end]``.
+
+    ``last`` is ``None`` when the range extends to the end of the file. The
+    range may include records just outside the time range; callers filter
+    the records themselves. Records written before indexing was enabled,
+    ahead of the first entry, have unknown times and are always included.
+    """
+
+    if not entries:
+        return 0, None
+    first = 0
+    if start is not None and entries[0].offset == 0:
+        first = next(
+            (entry.offset for entry in entries if entry.last_time >= start),
+            entries[-1].offset,
+        )
+    last: Optional[int] = None
+    if end is not None:
+        for entry in entries:
+            if entry.offset > first and entry.first_time > end:
+                last = entry.offset
+                break
+    return first, last
@@ -0,0 +1,649 @@
+"""Search log files written by the file sink.
+
+Files are scanned line by line through ``mmap``. Each line holding a JSON
+object (``serialize=True`` or ``LOGURICH_SERIALIZE``) is one record; in plain
+text files a record starts with a ``YYYY-MM-DD HH:MM:SS.mmm | LEVEL |`` prefix
+and extends over the following lines that do not. When a file has a time
+index, only the blocks that may hold matching records are read. Compressed
+backups are decompressed as a stream.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from logging import LogRecord
+from typing import IO, Any, Callable, Optional
+
+from .filesink import (
+    _DATE_SUFFIX_RE,
+    _NUMBERED_RE,
+    _STAMP_SUFFIX_RE,
+    COMPRESSION_EXTENSIONS,
+)
+from .handler import LogurichRenderer
+from .index import IndexEntry, _level_slot, read_index
+
+_EXTENSION_COMPRESSIONS = {
+    extension: compression for compression, extension in COMPRESSION_EXTENSIONS.items()
+}
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+_PLAIN_RE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\.(\d{3}) \| (\S+) *\| ")
+_PLAIN_PREFIX_RE = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3} \| ")
+_PLAIN_CONTEXT_BLOCK_RE = re.compile(r"(?:\[[^\]]*\])*")
+_PLAIN_CONTEXT_RE = re.compile(r"\[([^\]=]*)=([^\]]*)\]")
+_PLAIN_SOURCE_LINE_RE = re.compile(r"(.+):\d+")
+_THREAD_NAME_RE = re.compile(
+    r"(?:MainThread|Thread-\d+(?: \([^)]*\))?|Dummy-\d+"
+    r"|ThreadPoolExecutor-\d+_\d+|asyncio_\d+)\."
+)
+_ANY_THREAD_NAME_RE = re.compile(r"(?:[^.(]|\([^)]*\))*\.")
+_JSON_START = b"{"
+_JSON_LEVEL_RE = re.compile(rb'"level":\{"name":"[^"]*","no":(\d+)\}')
+
+
+@dataclass
+class LogEntry:
+    """A record read back from a log file.
+
+    ``text`` is the record as written, without the trailing newline, and
+    ``data`` the decoded object of a JSON record. ``created`` is ``None``
+    and ``levelno`` is ``0`` when the record does not carry them. ``name``
+    is only known for JSON records and plain records written with
+    ``log_verbose`` 2 or 3.
+    """
+
+    text: str
+    created: Optional[float]
+    levelno: int
+    levelname: str
+    name: Optional[str] = None
+    context: dict[str, Any] = field(default_factory=dict)
+    data: Optional[dict[str, Any]] = None
+
+
+@dataclass(frozen=True)
+class QueryFilter:
+    """Conditions a record must meet to be returned by :func:`query`.
+
+    Records are kept from ``start`` to ``end`` (timestamps, both inclusive),
+    at or above ``level``, from the logger ``name`` and its children, and
+    carrying every ``context`` key with the given value, compared as text.
+    """
+
+    start: Optional[float] = None
+    end: Optional[float] = None
+    level: int = logging.NOTSET
+    name: Optional[str] = None
+    context: tuple[tuple[str, str], ...] = ()
+
+    def matches(self, entry: LogEntry) -> bool:
+        if self.start is not None or self.end is not None:
+            if entry.created is None:
+                return False
+            if self.start is not None and entry.created < self.start:
+                return False
+            if self.end is not None and entry.created > self.end:
+                return False
+        if entry.levelno < self.level:
+            return False
+        if self.name and not (
+            entry.name is not None
+            and (entry.name == self.name or entry.name.startswith(f"{self.name}."))
+        ):
+            return False
+        return all(
+            key in entry.context and _context_text(entry.context[key]) == value
+            for key, value in self.context
+        )
+
+    def keeps_block(self, entry: IndexEntry) -> bool:
+        """Return whether an index block may hold matching records."""
+
+        if self.start is not None and entry.last_time < self.start:
+            return False
+        if self.end is not None and entry.first_time > self.end:
+            return False
+        if self.level > logging.NOTSET:
+            return any(entry.counts[_level_slot(self.level) :])
+        return True
+
+    def line_may_match(self) -> Callable[[bytes], bool]:
+        """Return a cheap byte test rejecting JSON lines before decoding them."""
+
+        needles = [
+            json.dumps(text, ensure_ascii=False)[1:-1].encode()
+            for text in (self.name, *(value for _, value in self.context))
+            if text
+        ]
+        level = self.level
+        if not needles and level <= logging.NOTSET:
+            return lambda line: True
+
+        def may_match(line: bytes) -> bool:
+            if not all(needle in line for needle in needles):
+                return False
+            if level > logging.NOTSET:
+                match = _JSON_LEVEL_RE.search(line)
+                return match is None or int(match.group(1)) >= level
+            return True
+
+        return may_match
+
+
+def _context_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def rotated_files(path: str) -> list[str]:
+    """Return the rotated backups of *path*, oldest first, followed by *path*."""
+
+    directory, name = os.path.split(os.path.abspath(path))
+    prefix = f"{name}."
+    backups: list[tuple[float, str]] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.startswith(prefix) or not entry.is_file():
+                continue
+            suffix = entry.name[len(prefix) :]
+            if any(
+                pattern.match(suffix)
+                for pattern in (_NUMBERED_RE, _DATE_SUFFIX_RE, _STAMP_SUFFIX_RE)
+            ):
+                backups.append((entry.stat().st_mtime, entry.path))
+    files = [backup for _, backup in sorted(backups)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def _byte_ranges(
+    entries: Sequence[IndexEntry], query_filter: QueryFilter
+) -> list[tuple[int, Optional[int]]]:
+    """Return the merged byte ranges of the index blocks worth reading."""
+
+    if not entries:
+        return [(0, None)]
+    ranges: list[tuple[int, Optional[int]]] = []
+    if entries[0].offset > 0:
+        # Records written before indexing was enabled are not covered.
+        ranges.append((0, entries[0].offset))
+    for position, entry in enumerate(entries):
+        end = entries[position + 1].offset if position + 1 < len(entries) else None
+        # The last block also covers the records written after the last entry.
+        if end is not None and not query_filter.keeps_block(entry):
+            continue
+        if ranges and ranges[-1][1] == entry.offset:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((entry.offset, end))
+    return ranges
+
+
+def _is_record_start(line: bytes) -> bool:
+    if line.startswith(_JSON_START):
+        return parse_json_line(line) is not None
+    return _PLAIN_PREFIX_RE.match(line) is not None
+
+
+def _next_record_start(mapped: mmap.mmap, position: int, size: int) -> int:
+    if position > 0 and mapped[position - 1 : position] != b"\n":
+        newline = mapped.find(b"\n", position, size)
+        position = size if newline < 0 else newline + 1
+    while position < size:
+        newline = mapped.find(b"\n", position, size)
+        line_end = size if newline < 0 else newline
+        if _is_record_start(mapped[position:line_end]):
+            return position
+        position = line_end + 1
+    return size
+
+
+def _iter_mapped_lines(
+    path: str,
+    ranges: Sequence[tuple[int, Optional[int]]],
+    *,
+    aligned: bool = True,
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Yield the lines of the records starting in each range.
+
+    A record starting before the end of a range is read to its last line.
+    Unless ``aligned``, ranges may start inside a record, whose remaining
+    lines are skipped: they belong to the previous range.
+    """
+
+    with open(path, "rb") as stream:
+        size = os.fstat(stream.fileno()).st_size
+        if limit is not None:
+            size = min(size, limit)
+        if size == 0:
+            return
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            find = mapped.find
+            for start, end in ranges:
+                end = size if end is None else min(end, size)
+                position = start
+                if not aligned:
+                    position = _next_record_start(mapped, position, size)
+                while position < size:
+                    newline = find(b"\n", position, size)
+                    line_end = size if newline < 0 else newline
+                    line = mapped[position:line_end]
+                    if position >= end and _is_record_start(line):
+                        break
+                    yield line
+                    position = line_end + 1
+
+
+def _iter_compressed_lines(
+    path: str,
+    opener: Callable[..., IO[bytes]],
+    ranges: Sequence[tuple[int, Optional[int]]],
+    limit: Optional[int],
+) -> Iterator[bytes]:
+    """Like `_iter_mapped_lines`, for a compressed file read as a stream."""
+
+    with opener(path, "rb") as stream:
+        for start, end in ranges:
+            # Index offsets refer to the decompressed content.
+            stream.seek(start)
+            position = start
+            for line in stream:
+                if limit is not None and position >= limit:
+                    break
+                line_start = position
+                position += len(line)
+                line = line.rstrip(b"\n")
+                if end is not None and line_start >= end and _is_record_start(line):
+                    break
+                yield line
+
+
+def _compression(path: str) -> Optional[str]:
+    return _EXTENSION_COMPRESSIONS.get(os.path.splitext(path)[1])
+
+
+def iter_lines(
+    path: str,
+    ranges: Sequence[tuple[int, Optional[int]]] = ((0, None),),
+    *,
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Yield the lines of *path* within *ranges*, without line terminators.
+
+    Nothing past the first ``limit`` bytes is read.
+    """
+
+    compression = _compression(path)
+    if compression is not None:
+        opener = importlib.import_module(compression).open
+        return _iter_compressed_lines(path, opener, ranges, limit)
+    return _iter_mapped_lines(path, ranges, limit=limit)
+
+
+def is_plain_file(path: str) -> bool:
+    """Return whether the first line of *path* is a plain text record."""
+
+    lines = iter_lines(path)
+    try:
+        first = next(iter(lines), b"")
+    finally:
+        lines.close()
+    return bool(first) and parse_json_line(first) is None
+
+
+def parse_json_line(line: bytes) -> Optional[LogEntry]:
+    """Return the record of a JSON line, or ``None`` if it is not one."""
+
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    record = data.get("record", data)
+    if not isinstance(record, Mapping):
+        return None
+    created = record.get("time")
+    if isinstance(created, Mapping):
+        created = created.get("timestamp")
+    level = record.get("level")
+    if isinstance(level, Mapping):
+        levelno, levelname = level.get("no"), level.get("name")
+    else:
+        levelname, levelno = level, None
+    if not isinstance(levelname, str):
+        levelname = logging.getLevelName(levelno) if levelno is not None else ""
+    if not isinstance(levelno, int):
+        levelno = logging.getLevelName(levelname)
+        levelno = levelno if isinstance(levelno, int) else 0
+    extra = record.get("extra")
+    name = record.get("name")
+    return LogEntry(
+        text=line.decode("utf-8", "replace"),
+        created=float(created) if isinstance(created, (int, float)) else None,
+        levelno=levelno,
+        levelname=levelname,
+        name=name if isinstance(name, str) else None,
+        context=dict(extra) if isinstance(extra, Mapping) else {},
+        data=data,
+    )
+
+
+class _PlainTimes:
+    """Convert the local ``YYYY-MM-DD HH:MM:SS`` prefixes, cached per second."""
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._seconds = 0.0
+
+    def __call__(self, text: str) -> float:
+        if text != self._text:
+            self._seconds = time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+            self._text = text
+        return self._seconds
+
+
+def _source_name(source: str, log_verbose: Optional[int]) -> Optional[str]:
+    """Return the logger name of a ``process[.thread].name:line`` source label."""
+
+    match = _PLAIN_SOURCE_LINE_RE.fullmatch(source)
+    if match is None or log_verbose == 1:
+        return None
+    _, separator, label = match.group(1).partition(".")
+    if not separator:
+        return None
+    if log_verbose == 3:
+        thread = _ANY_THREAD_NAME_RE.match(label)
+    elif log_verbose is None:
+        # Guess verbose=3 from the names Python gives threads by default.
+        thread = _THREAD_NAME_RE.match(label)
+    else:
+        thread = None
+    return label[thread.end() :] if thread else label
+
+
+def parse_plain_line(
+    line: str,
+    times: Optional[Callable[[str], float]] = None,
+    *,
+    log_verbose: Optional[int] = None,
+) -> Optional[LogEntry]:
+    """Return the record started by a plain text line, or ``None``.
+
+    ``log_verbose`` is the ``log_verbose`` the file was written with, which
+    tells apart the source label parts; it is guessed when ``None``.
+    """
+
+    match = _PLAIN_RE.match(line)
+    if match is None:
+        return None
+    seconds, millis, levelname = match.groups()
+    rest = line[match.end() :]
+    name = None
+    if log_verbose != 0:
+        # The source label runs up to the next delimiter, padded with spaces.
+        source, separator, after = rest.partition(" | ")
+        source = source.rstrip(" ")
+        if (
+            separator
+            and source
+            and not source.startswith("[")
+            and (
+                log_verbose is not None
+                or " " not in source
+                or _PLAIN_SOURCE_LINE_RE.fullmatch(source) is not None
+            )
+        ):
+            rest = after
+            name = _source_name(source, log_verbose)
+    context = _PLAIN_CONTEXT_BLOCK_RE.match(rest).group()
+    levelno = logging.getLevelName(levelname)
+    return LogEntry(
+        text=line,
+        created=(times or _PlainTimes())(seconds) + int(millis) / 1000,
+        levelno=levelno if isinstance(levelno, int) else 0,
+        levelname=levelname,
+        name=name,
+        context=dict(_PLAIN_CONTEXT_RE.findall(context)),
+    )
+
+
+class RecordParser:
+    """Group lines into records, across successive batches of lines.
+
+    A plain text record is held back until the next record starts or
+    :meth:`flush` is called, as more of its lines may follow in the next
+    batch. JSON lines failing *line_may_match* are skipped.
+    """
+
+    def __init__(
+        self,
+        line_may_match: Callable[[bytes], bool] = lambda _: True,
+        *,
+        log_verbose: Optional[int] = None,
+    ) -> None:
+        self.line_may_match = line_may_match
+        self.log_verbose = log_verbose
+        self._times = _PlainTimes()
+        self._pending: Optional[LogEntry] = None
+        self._continuation: list[str] = []
+
+    def feed(self, lines: Iterable[bytes]) -> Iterator[LogEntry]:
+        """Yield the records completed by *lines*."""
+
+        line_may_match = self.line_may_match
+        log_verbose = self.log_verbose
+        times = self._times
+        continuation = self._continuation
+        pending = self._pending
+        try:
+            for line in lines:
+                if line.startswith(_JSON_START):
+                    if not line_may_match(line):
+                        continue
+                    entry = parse_json_line(line)
+                    if entry is not None:
+                        if pending is not None:
+                            completed, pending = pending, None
+                            yield _joined(completed, continuation)
+                        yield entry
+                        continue
+                text = line.decode("utf-8", "replace")
+                entry = parse_plain_line(text, times, log_verbose=log_verbose)
+                if entry is None:
+                    if pending is not None:
+                        continuation.append(text)
+                    continue
+                completed, pending = pending, entry
+                if completed is not None:
+                    yield _joined(completed, continuation)
+        finally:
+            self._pending = pending
+
+    def flush(self) -> Optional[LogEntry]:
+        """Return the record held back, if any."""
+
+        pending, self._pending = self._pending, None
+        return None if pending is None else _joined(pending, self._continuation)
+
+
+def parse_lines(
+    lines: Iterable[bytes],
+    line_may_match: Callable[[bytes], bool] = lambda _: True,
+    *,
+    log_verbose: Optional[int] = None,
+) -> Iterator[LogEntry]:
+    """Group *lines* into records; JSON lines failing *line_may_match* are skipped."""
+
+    parser = RecordParser(line_may_match, log_verbose=log_verbose)
+    yield from parser.feed(lines)
+    entry = parser.flush()
+    if entry is not None:
+        yield entry
+
+
+def _joined(entry: LogEntry, continuation: list[str]) -> LogEntry:
+    if continuation:
+        entry.text = "\n".join((entry.text, *continuation))
+        continuation.clear()
+    return entry
+
+
+def _matching(
+    lines: Iterable[bytes], query_filter: QueryFilter, log_verbose: Optional[int]
+) -> Iterator[LogEntry]:
+    entries = parse_lines(lines, query_filter.line_may_match(), log_verbose=log_verbose)
+    return (entry for entry in entries if query_filter.matches(entry))
+
+
+def _file_ranges(
+    path: str, query_filter: QueryFilter
+) -> list[tuple[int, Optional[int]]]:
+    try:
+        entries = read_index(path)
+    except ValueError:
+        entries = []
+    return _byte_ranges(entries, query_filter)
+
+
+def scan_file(
+    path: str,
+    query_filter: QueryFilter,
+    *,
+    end: Optional[int] = None,
+    log_verbose: Optional[int] = None,
+) -> Iterator[LogEntry]:
+    """Yield the records of *path* matching *query_filter*, in file order.
+
+    With ``end``, only the first ``end`` bytes of the file are read.
+    """
+
+    lines = iter_lines(path, _file_ranges(path, query_filter), limit=end)
+    return _matching(lines, query_filter, log_verbose)
+
+
+def _scan_chunk(
+    path: str,
+    byte_range: Optional[tuple[int, int]],
+    aligned: bool,
+    query_filter: QueryFilter,
+    log_verbose: Optional[int],
+) -> list[LogEntry]:
+    """Return the matching records starting in *byte_range* (a worker task)."""
+
+    if byte_range is None:
+        return list(scan_file(path, query_filter, log_verbose=log_verbose))
+    lines = _iter_mapped_lines(path, [byte_range], aligned=aligned)
+    return list(_matching(lines, query_filter, log_verbose))
+
+
+def _chunks(
+    paths: Sequence[str], query_filter: QueryFilter, chunk_size: int
+) -> Iterator[tuple[str, Optional[tuple[int, int]], bool]]:
+    for path in paths:
+        if _compression(path) is not None:
+            # A compressed stream can only be read from its start.
+            yield path, None, True
+            continue
+        size = os.path.getsize(path)
+        for start, end in _file_ranges(path, query_filter):
+            end = size if end is None else min(end, size)
+            for chunk_start in range(start, end, chunk_size):
+                chunk = (chunk_start, min(chunk_start + chunk_size, end))
+                yield path, chunk, chunk_start == start
+
+
+def query(
+    paths: Sequence[str],
+    query_filter: QueryFilter,
+    *,
+    workers: Optional[int] = 1,
+    chunk_size: int = SCAN_CHUNK_SIZE,
+    log_verbose: Optional[int] = None,
+) -> Iterator[LogEntry]:
+    """Yield the matching records of *paths*, in file order.
+
+    With one worker the files are streamed record by record. With more
+    (``0`` or ``None`` for one per CPU), the files are split into chunks of about
+    ``chunk_size`` bytes, each scanned by a worker process; at most
+    ``workers`` chunks are in flight, so memory use stays bounded. A
+    compressed backup is a single chunk.
+    """
+
+    if not workers:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for path in paths:
+            yield from scan_file(path, query_filter, log_verbose=log_verbose)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: deque[Future[list[LogEntry]]] = deque()
+        for path, byte_range, aligned in _chunks(paths, query_filter, chunk_size):
+            if len(in_flight) >= workers:
+                yield from in_flight.popleft().result()
+            in_flight.append(
+                executor.submit(
+                    _scan_chunk, path, byte_range, aligned, query_filter, log_verbose
+                )
+            )
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def entry_to_record(entry: LogEntry) -> LogRecord:
+    """Rebuild a ``LogRecord`` from a JSON record for :class:`LogurichRenderer`."""
+
+    record = (entry.data or {}).get("record", entry.data or {})
+    source = record.get("file")
+    process = record.get("process")
+    thread = record.get("thread")
+    exception = record.get("exception")
+    created = entry.created if entry.created is not None else time.time()
+    rebuilt = logging.makeLogRecord(
+        {
+            "name": entry.name or "root",
+            "msg": record.get("message", ""),
+            "levelno": entry.levelno,
+            "levelname": entry.levelname,
+            "pathname": source.get("path", "") if isinstance(source, Mapping) else "",
+            "lineno": record.get("line") or 0,
+            "funcName": record.get("function"),
+            "created": created,
+            "msecs": (created - int(created)) * 1000,
+            "process": process.get("id") if isinstance(process, Mapping) else None,
+            "processName": (
+                process.get("name") if isinstance(process, Mapping) else "MainProcess"
+            ),
+            "thread": thread.get("id") if isinstance(thread, Mapping) else None,
+            "threadName": (
+                thread.get("name") if isinstance(thread, Mapping) else "MainThread"
+            ),
+        }
+    )
+    rebuilt.module = record.get("module") or rebuilt.module
+    rebuilt.context = dict(entry.context)
+    rebuilt.formatted_exception = (
+        exception.get("traceback", "") if isinstance(exception, Mapping) else ""
+    )
+    return rebuilt
+
+
+def render_entry(entry: LogEntry, renderer: LogurichRenderer) -> str:
+    """Return *entry* as a plain text record, re-rendering JSON records."""
+
+    if entry.data is None:
+        return entry.text
+    return renderer.format_file(entry_to_record(entry))
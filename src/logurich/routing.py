@@ -0,0 +1,143 @@
+"""Routing of log records to several file sinks."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import timedelta
+from logging import LogRecord
+from typing import Any, Callable, Optional, Union
+
+from .filesink import Compression, LogurichFileHandler
+
+ROUTE_CACHE_MAX_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class Sink:
+    """A file sink declared with ``init_logger(sinks=[...])``.
+
+    The sink receives records at or above ``level`` from the loggers in
+    ``modules`` and their children, carrying every ``context`` key with the
+    given value. ``level`` replaces the global ``log_level`` and
+    ``level_by_module``, which apply when it is ``None``. ``serialize``
+    writes JSON instead of plain text and defaults to ``LOGURICH_SERIALIZE``.
+    ``filename`` is relative to ``log_folder``; the other fields behave like
+    the ``init_logger`` parameters of the same name.
+    """
+
+    filename: str
+    level: Optional[Union[str, int]] = None
+    modules: Optional[Sequence[str]] = None
+    context: Optional[Mapping[str, Any]] = None
+    serialize: Optional[bool] = None
+    rotation: Optional[Any] = "12:00"
+    retention: Optional[Union[int, timedelta]] = 10
+    retention_bytes: Optional[int] = None
+    compression: Optional[Compression] = None
+
+
+@dataclass(frozen=True)
+class Route:
+    """A compiled sink: its handler and the filters records must pass.
+
+    A ``level`` of ``None`` defers to the router's ``default_level``.
+    """
+
+    handler: LogurichFileHandler
+    level: Optional[int] = None
+    modules: Optional[tuple[str, ...]] = None
+    context: tuple[tuple[str, Any], ...] = ()
+
+    def accepts(self, name: str, levelno: int) -> bool:
+        if self.level is not None and levelno < self.level:
+            return False
+        if self.modules is None:
+            return True
+        return any(
+            not module or name == module or name.startswith(f"{module}.")
+            for module in self.modules
+        )
+
+
+class SinkRouter(logging.Handler):
+    """Dispatch each record to the sinks that accept it.
+
+    Level and module filters only depend on the logger name and level, so the
+    matching routes are computed once per ``(name, levelno)`` and cached;
+    context filters, and the ``default_level(name)`` of routes without a
+    level, which can change at runtime, are checked per record. Sinks sharing
+    a formatter share the formatted text, so a record is formatted once per
+    distinct format.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        default_level: Callable[[str], int] = lambda name: logging.NOTSET,
+    ) -> None:
+        super().__init__()
+        self.routes = tuple(routes)
+        self.default_level = default_level
+        self._cache: dict[tuple[str, int], tuple[Route, ...]] = {}
+
+    @property
+    def handlers(self) -> tuple[LogurichFileHandler, ...]:
+        return tuple(route.handler for route in self.routes)
+
+    def _routes_for(self, name: str, levelno: int) -> tuple[Route, ...]:
+        key = (name, levelno)
+        routes = self._cache.get(key)
+        if routes is None:
+            routes = tuple(route for route in self.routes if route.accepts(*key))
+            if len(self._cache) >= ROUTE_CACHE_MAX_SIZE:
+                self._cache.clear()
+            self._cache[key] = routes
+        return routes
+
+    def emit(self, record: LogRecord) -> None:
+        routes = self._routes_for(record.name, record.levelno)
+        if not routes:
+            return
+        context = getattr(record, "context", None) or {}
+        messages: dict[int, str] = {}
+        default_level: Optional[int] = None
+        for route in routes:
+            if route.level is None:
+                if default_level is None:
+                    default_level = self.default_level(record.name)
+                if record.levelno < default_level:
+                    continue
+            if route.context and not all(
+                getattr(context.get(key), "value", _MISSING) == value
+                for key, value in route.context
+            ):
+                continue
+            handler = route.handler
+            message = messages.get(id(handler.formatter))
+            if message is None:
+                try:
+                    message = handler.format(record)
+                except RecursionError:
+                    raise
+                except Exception:
+                    handler.handleError(record)
+                    continue
+                messages[id(handler.formatter)] = message
+            with handler.lock:
+                handler.emit_formatted(record, message)
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        try:
+            for handler in self.handlers:
+                handler.close()
+        finally:
+            super().close()
+
+
+_MISSING = object()
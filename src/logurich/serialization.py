@@ -0,0 +1,394 @@
+"""JSON serialization of log records."""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Mapping
+from datetime import timedelta
+from logging import LogRecord
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from .struct import logger_state
+from .utils import context_display_name
+
+if TYPE_CHECKING:
+    from .handler import LogurichRenderer
+
+JsonDumps = Callable[[Any], Union[str, bytes]]
+
+SERIALIZATION_START = perf_counter()
+STANDARD_LOG_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__)
+LOGURICH_INTERNAL_RECORD_ATTRS = frozenset(
+    {
+        "_logurich_prepared",
+        "context",
+        "end",
+        "exception_data",
+        "formatted_exception",
+        "markup",
+        "message",
+        "render_cache_key",
+        "render_prefix",
+        "render_width",
+        "renderables",
+        "rich_highlight",
+        "rich_traceback",
+    }
+)
+FRAGMENT_CACHE_MAX_SIZE = 1024
+SCHEMA_SOURCES = (
+    "text",
+    "message",
+    "elapsed",
+    "elapsed.repr",
+    "elapsed.seconds",
+    "exception",
+    "extra",
+    "extra.*",
+    "file",
+    "file.name",
+    "file.path",
+    "function",
+    "level",
+    "level.name",
+    "level.no",
+    "line",
+    "module",
+    "name",
+    "process",
+    "process.id",
+    "process.name",
+    "thread",
+    "thread.id",
+    "thread.name",
+    "time",
+    "time.repr",
+    "time.timestamp",
+)
+
+_encode_basestring = json.encoder.encode_basestring
+
+
+def _default_dumps(value: Any) -> str:
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def validate_json_schema(schema: Any) -> dict[str, str]:
+    """Check a ``json_schema`` mapping and return it as a plain dict."""
+
+    if not isinstance(schema, Mapping) or not schema:
+        raise TypeError("json_schema must be a non-empty mapping")
+    validated: dict[str, str] = {}
+    for key, source in schema.items():
+        if not isinstance(key, str) or not isinstance(source, str):
+            raise TypeError("json_schema keys and sources must be strings")
+        if source not in SCHEMA_SOURCES and not (
+            source.startswith("extra.") and len(source) > len("extra.")
+        ):
+            raise ValueError(
+                f"Unknown json_schema source {source!r}, "
+                f"expected 'extra.<key>' or one of: {', '.join(SCHEMA_SOURCES)}"
+            )
+        validated[key] = source
+    return validated
+
+
+class _SerializedRecord:
+    """Per-record values computed on first use by schema fields."""
+
+    __slots__ = ("_extra", "_message", "_text", "record", "serializer")
+
+    def __init__(self, serializer: JsonSerializer, record: LogRecord) -> None:
+        self.serializer = serializer
+        self.record = record
+        self._message: Optional[str] = None
+        self._text: Optional[str] = None
+        self._extra: Optional[dict[str, Any]] = None
+
+    def message(self) -> str:
+        if self._message is None:
+            self._message, self._text = self.serializer.message_and_text(
+                self.record, include_text=self.serializer._schema_text
+            )
+        return self._message
+
+    def text(self) -> str:
+        self.message()
+        if not self._text:
+            return ""
+        end = getattr(self.record, "end", "\n")
+        return f"{self._text}{end}"
+
+    def extra(self) -> dict[str, Any]:
+        if self._extra is None:
+            self._extra = self.serializer.extra(self.record)
+        return self._extra
+
+
+class JsonSerializer:
+    """Serialize log records to JSON.
+
+    Without a ``schema`` the payload has the loguru-compatible nested shape.
+    The human-readable ``text`` field is only rendered when ``text`` is
+    enabled or when renderables have to be folded into the message. Fields
+    that repeat across records (file, level, process and thread) are encoded
+    once and spliced into the payload. ``dumps`` replaces the JSON encoder;
+    it may return ``str`` or UTF-8 ``bytes``.
+
+    A ``schema`` maps output keys to source fields (see ``SCHEMA_SOURCES``),
+    e.g. ``{"ts": "time.timestamp", "lvl": "level.name", "msg": "message"}``.
+    ``"extra.<key>"`` selects a single extra value and ``"extra.*"`` merges
+    all extra values into the top level (its output key is ignored). The
+    schema is compiled once into a list of field encoders.
+    """
+
+    def __init__(
+        self,
+        renderer: LogurichRenderer,
+        *,
+        text: bool = True,
+        dumps: Optional[JsonDumps] = None,
+        schema: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.renderer = renderer
+        self.text = text
+        self._dumps = dumps
+        self._fragments: dict[tuple[Any, ...], str] = {}
+        self._fields = self._compile_schema(schema) if schema is not None else None
+        # Schema fields only need the plain-text line for a ``text`` source.
+        self._schema_text = schema is not None and "text" in schema.values()
+
+    def encode(self, value: Any) -> str:
+        if self._dumps is None:
+            return _default_dumps(value)
+        encoded = self._dumps(value)
+        if isinstance(encoded, bytes):
+            return encoded.decode("utf-8")
+        return encoded
+
+    def encode_str(self, value: Optional[str]) -> str:
+        if value is None:
+            return "null"
+        if self._dumps is None:
+            return _encode_basestring(value)
+        return self.encode(value)
+
+    def _fragment(self, key: tuple[Any, ...], build: Callable[[], Any]) -> str:
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            if len(self._fragments) >= FRAGMENT_CACHE_MAX_SIZE:
+                self._fragments.clear()
+            fragment = self.encode(build())
+            self._fragments[key] = fragment
+        return fragment
+
+    def file_fragment(self, record: LogRecord) -> str:
+        pathname = record.pathname
+        return self._fragment(
+            ("file", pathname),
+            lambda: {"name": Path(pathname).name, "path": str(Path(pathname))},
+        )
+
+    def level_fragment(self, record: LogRecord) -> str:
+        return self._fragment(
+            ("level", record.levelname, record.levelno),
+            lambda: {"name": record.levelname, "no": record.levelno},
+        )
+
+    def process_fragment(self, record: LogRecord) -> str:
+        return self._fragment(
+            ("process", record.process, record.processName),
+            lambda: {"id": record.process, "name": record.processName},
+        )
+
+    def thread_fragment(self, record: LogRecord) -> str:
+        return self._fragment(
+            ("thread", record.thread, record.threadName),
+            lambda: {"id": record.thread, "name": record.threadName},
+        )
+
+    def extra(self, record: LogRecord) -> dict[str, Any]:
+        context = getattr(record, "context", {}) or {}
+        serialized = dict(logger_state.get("env_extra", {}))
+        user_extra = {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in STANDARD_LOG_RECORD_ATTRS
+            and key not in LOGURICH_INTERNAL_RECORD_ATTRS
+            and not key.startswith("_logurich_")
+        }
+        if user_extra:
+            serialized.update(user_extra)
+        serialized.update(
+            {
+                context_display_name(key): getattr(value, "value", value)
+                for key, value in context.items()
+            }
+        )
+        return serialized
+
+    def message_and_text(
+        self, record: LogRecord, *, include_text: Optional[bool] = None
+    ) -> tuple[str, Optional[str]]:
+        """Return the message and, when needed, the rendered plain-text line."""
+
+        message = record.getMessage()
+        renderables = self.renderer._renderables(record)
+        if include_text is None:
+            include_text = self.text
+        if not include_text and not renderables:
+            return message, None
+        text = self.renderer.format_file(record)
+        if renderables and text:
+            continuation = "\n".join(text.splitlines()[1:])
+            if continuation:
+                message = f"{message}\n{continuation}"
+        return message, text
+
+    def _compile_schema(
+        self, schema: Mapping[str, str]
+    ) -> list[tuple[Optional[str], Callable[[_SerializedRecord], str]]]:
+        getters = self._field_getters()
+        schema = validate_json_schema(schema)
+        self._schema_keys = frozenset(
+            key for key, source in schema.items() if source != "extra.*"
+        )
+        fields: list[tuple[Optional[str], Callable[[_SerializedRecord], str]]] = []
+        for key, source in schema.items():
+            if source == "extra.*":
+                fields.append((None, self._field_extra_spread))
+                continue
+            if source.startswith("extra."):
+                getter = self._extra_field_getter(source.split(".", 1)[1])
+            else:
+                getter = getters[source]
+            fields.append((f"{self.encode_str(key)}:", getter))
+        return fields
+
+    def _extra_field_getter(self, name: str) -> Callable[[_SerializedRecord], str]:
+        return lambda item: self.encode(item.extra().get(name))
+
+    def _field_extra_spread(self, item: _SerializedRecord) -> str:
+        extra = item.extra()
+        if not self._schema_keys.isdisjoint(extra):
+            # Keys taken by schema fields are spread as ``extra.<key>``.
+            extra = {
+                f"extra.{key}" if key in self._schema_keys else key: value
+                for key, value in extra.items()
+            }
+        encoded = self.encode(extra)
+        return encoded[1:-1].strip()
+
+    def _field_getters(self) -> dict[str, Callable[[_SerializedRecord], str]]:
+        encode_str = self.encode_str
+
+        def elapsed_seconds() -> float:
+            return round(perf_counter() - SERIALIZATION_START, 6)
+
+        def elapsed() -> dict[str, Any]:
+            seconds = elapsed_seconds()
+            return {"repr": str(timedelta(seconds=seconds)), "seconds": seconds}
+
+        def exception(item: _SerializedRecord) -> str:
+            data = getattr(item.record, "exception_data", None)
+            return "null" if data is None else self.encode(data)
+
+        return {
+            "text": lambda item: encode_str(item.text()),
+            "message": lambda item: encode_str(item.message()),
+            "elapsed": lambda item: self.encode(elapsed()),
+            "elapsed.repr": lambda item: encode_str(
+                str(timedelta(seconds=elapsed_seconds()))
+            ),
+            "elapsed.seconds": lambda item: repr(elapsed_seconds()),
+            "exception": exception,
+            "extra": lambda item: self.encode(item.extra()),
+            "file": lambda item: self.file_fragment(item.record),
+            "file.name": lambda item: encode_str(Path(item.record.pathname).name),
+            "file.path": lambda item: encode_str(str(Path(item.record.pathname))),
+            "function": lambda item: encode_str(item.record.funcName),
+            "level": lambda item: self.level_fragment(item.record),
+            "level.name": lambda item: encode_str(item.record.levelname),
+            "level.no": lambda item: str(item.record.levelno),
+            "line": lambda item: str(item.record.lineno),
+            "module": lambda item: encode_str(item.record.module),
+            "name": lambda item: encode_str(item.record.name),
+            "process": lambda item: self.process_fragment(item.record),
+            "process.id": lambda item: self.encode(item.record.process),
+            "process.name": lambda item: encode_str(item.record.processName),
+            "thread": lambda item: self.thread_fragment(item.record),
+            "thread.id": lambda item: self.encode(item.record.thread),
+            "thread.name": lambda item: encode_str(item.record.threadName),
+            "time": lambda item: self.encode(
+                {
+                    "repr": self.renderer.timestamps.isoformat(item.record.created),
+                    "timestamp": item.record.created,
+                }
+            ),
+            "time.repr": lambda item: encode_str(
+                self.renderer.timestamps.isoformat(item.record.created)
+            ),
+            "time.timestamp": lambda item: repr(item.record.created),
+        }
+
+    def _serialize_schema(self, record: LogRecord) -> str:
+        item = _SerializedRecord(self, record)
+        parts: list[str] = []
+        for key, getter in self._fields:
+            value = getter(item)
+            if key is None:
+                if value:
+                    parts.append(value)
+            else:
+                parts.append(f"{key}{value}")
+        return f"{{{','.join(parts)}}}"
+
+    def serialize(self, record: LogRecord) -> str:
+        if self._fields is not None:
+            return self._serialize_schema(record)
+        message, text = self.message_and_text(record)
+        elapsed_seconds = perf_counter() - SERIALIZATION_START
+        exception_data = getattr(record, "exception_data", None)
+        encode_str = self.encode_str
+
+        parts = ["{"]
+        if self.text:
+            end = getattr(record, "end", "\n")
+            parts += ['"text":', encode_str(f"{text}{end}" if text else ""), ","]
+        parts += [
+            '"record":{"elapsed":{"repr":',
+            encode_str(str(timedelta(seconds=elapsed_seconds))),
+            ',"seconds":',
+            repr(round(elapsed_seconds, 6)),
+            '},"exception":',
+            "null" if exception_data is None else self.encode(exception_data),
+            ',"extra":',
+            self.encode(self.extra(record)),
+            ',"file":',
+            self.file_fragment(record),
+            ',"function":',
+            encode_str(record.funcName),
+            ',"level":',
+            self.level_fragment(record),
+            ',"line":',
+            str(record.lineno),
+            ',"message":',
+            encode_str(message),
+            ',"module":',
+            encode_str(record.module),
+            ',"name":',
+            encode_str(record.name),
+            ',"process":',
+            self.process_fragment(record),
+            ',"thread":',
+            self.thread_fragment(record),
+            ',"time":{"repr":',
+            encode_str(self.renderer.timestamps.isoformat(record.created)),
+            ',"timestamp":',
+            repr(record.created),
+            "}}}",
+        ]
+        return "".join(parts)
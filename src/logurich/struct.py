@@ -5,6 +5,7 @@ from typing import Any
 logger_state: dict[str, Any] = {
     "min_level": None,
     "level_by_module": None,
+    "sink_level": None,
     "rich_highlight": False,
     "queue": None,
     "listener": None,
@@ -0,0 +1,237 @@
+"""Follow a log file as it grows, across rotation and truncation."""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import replace
+from typing import Optional
+
+from .query import (
+    LogEntry,
+    QueryFilter,
+    RecordParser,
+    iter_lines,
+    parse_lines,
+    query,
+    rotated_files,
+    scan_file,
+)
+
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_READ_SIZE = 1024 * 1024
+_BACKWARD_BLOCK_SIZE = 64 * 1024
+
+
+def _identity(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_dev, stat.st_ino
+
+
+def _complete_lines_end(fd: int, size: int) -> int:
+    """Return the offset following the last newline in the first *size* bytes."""
+
+    position = size
+    while position > 0:
+        block_size = min(_BACKWARD_BLOCK_SIZE, position)
+        position -= block_size
+        os.lseek(fd, position, os.SEEK_SET)
+        index = os.read(fd, block_size).rfind(b"\n")
+        if index >= 0:
+            return position + index + 1
+    return 0
+
+
+class LogFollower:
+    """Read the complete lines appended to a log file.
+
+    The file is opened again from the start once it is replaced, e.g. by a
+    rotation, after the rest of the replaced file has been read; it is read
+    again from the start when it shrinks (truncation). ``offset`` is where
+    reading starts; by default, after the last complete line of the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        offset: Optional[int] = None,
+        read_size: int = DEFAULT_READ_SIZE,
+    ) -> None:
+        self.path = path
+        self.read_size = read_size
+        self.position = 0
+        self._fd: Optional[int] = None
+        self._identity: Optional[tuple[int, int]] = None
+        self._partial = b""
+        self._open(offset)
+
+    def _open(self, offset: Optional[int]) -> None:
+        try:
+            fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        except FileNotFoundError:
+            return
+        self._fd = fd
+        stat = os.fstat(fd)
+        self._identity = _identity(stat)
+        if offset is None:
+            offset = _complete_lines_end(fd, stat.st_size)
+        self.position = os.lseek(fd, offset, os.SEEK_SET)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read(self) -> bytes:
+        if self._fd is None:
+            return b""
+        data = os.read(self._fd, self.read_size)
+        self.position += len(data)
+        return data
+
+    def _switch_if_replaced(self) -> bytes:
+        """Return the last data of a replaced file and reopen *path*."""
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Between the rename of a rotation and the creation of the new file.
+            return b""
+        if self._fd is None:
+            self._open(0)
+            return b""
+        if _identity(stat) != self._identity:
+            # Records flushed just before the rename are still to be read.
+            data = b"".join(iter(self._read, b""))
+            if self._partial or (data and not data.endswith(b"\n")):
+                data += b"\n"
+            self.close()
+            self._open(0)
+            return data
+        if stat.st_size < self.position:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            self.position = 0
+            self._partial = b""
+        return b""
+
+    def read_lines(self) -> list[bytes]:
+        """Return the lines completed since the last call, without terminators."""
+
+        data = self._read()
+        if not data:
+            data = self._switch_if_replaced()
+            if not data:
+                return []
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return lines
+
+
+def line_offset_from_end(path: str, count: int, end: int) -> int:
+    """Return the offset of the last *count* lines in the first *end* bytes."""
+
+    with open(path, "rb") as stream:
+        position = end
+        newlines = 0
+        while position > 0:
+            size = min(_BACKWARD_BLOCK_SIZE, position)
+            position -= size
+            stream.seek(position)
+            block = stream.read(size)
+            if position + size == end and block.endswith(b"\n"):
+                block = block[:-1]
+            index = len(block)
+            while True:
+                index = block.rfind(b"\n", 0, index)
+                if index < 0:
+                    break
+                newlines += 1
+                if newlines == count:
+                    return position + index + 1
+    return 0
+
+
+def last_entries(
+    path: str,
+    query_filter: QueryFilter,
+    count: int,
+    *,
+    end: int,
+    log_verbose: Optional[int] = None,
+) -> list[LogEntry]:
+    """Return the last *count* matching records in the first *end* bytes."""
+
+    if count <= 0 or end <= 0:
+        return []
+    may_match = query_filter.line_may_match()
+    wanted = count
+    while True:
+        start = line_offset_from_end(path, wanted, end)
+        lines = iter_lines(path, [(start, end)])
+        entries = [
+            entry
+            for entry in parse_lines(lines, may_match, log_verbose=log_verbose)
+            if query_filter.matches(entry)
+        ]
+        if len(entries) >= count or start == 0:
+            return entries[-count:]
+        # Too many lines were filtered out: look further back.
+        wanted *= 4
+
+
+def follow(
+    path: str,
+    query_filter: QueryFilter,
+    *,
+    lines: int = 10,
+    since: Optional[float] = None,
+    forever: bool = True,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop: Optional[threading.Event] = None,
+    log_verbose: Optional[int] = None,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[list[LogEntry]]:
+    """Yield batches of matching records of *path*.
+
+    The first batch catches up with the existing content: the records logged
+    since ``since`` in the rotated backups and the file, read through their
+    time index when they have one, or else the last ``lines`` records. With
+    ``forever``, the records appended later are then yielded as they arrive,
+    and an empty batch whenever the file has been idle for ``poll_interval``
+    seconds, until ``stop`` is set. A plain text record is yielded once the
+    next record starts or the file is idle, so that its continuation lines
+    are never split from it.
+    """
+
+    stop = stop or threading.Event()
+    follower = LogFollower(path, read_size=read_size)
+    try:
+        end = follower.position
+        if since is not None:
+            catch_up = replace(query_filter, start=since)
+            backups = [backup for backup in rotated_files(path) if backup != path]
+            entries = list(query(backups, catch_up, log_verbose=log_verbose))
+            entries.extend(scan_file(path, catch_up, end=end, log_verbose=log_verbose))
+            yield entries
+        else:
+            yield last_entries(
+                path, query_filter, lines, end=end, log_verbose=log_verbose
+            )
+        parser = RecordParser(query_filter.line_may_match(), log_verbose=log_verbose)
+        while forever and not stop.is_set():
+            new_lines = follower.read_lines()
+            if not new_lines:
+                held = parser.flush()
+                if held is not None and query_filter.matches(held):
+                    yield [held]
+                yield []
+                stop.wait(poll_interval)
+                continue
+            entries = [
+                entry for entry in parser.feed(new_lines) if query_filter.matches(entry)
+            ]
+            if entries:
+                yield entries
+    finally:
+        follower.close()
@@ -0,0 +1,307 @@
+"""Multiprocessing transport used to ship log records to the listener."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import logging.handlers
+import multiprocessing as mp
+import multiprocessing.queues
+import queue as queue_module
+import threading
+import time
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Optional
+
+_SEQUENCE = itertools.count()
+_NO_RECORD = object()
+LEVEL_TABLE_SIZE = 65536
+# CPython Queue internals written to by LogurichQueue._put_synchronous.
+_SYNCHRONOUS_PUT_ATTRIBUTES = ("_closed", "_sem", "_wlock", "_send_bytes")
+
+
+def _validate_watermarks(watermarks: Any) -> tuple[int, int]:
+    try:
+        debug_mark, info_mark = watermarks
+    except (TypeError, ValueError):
+        raise TypeError(
+            "load_shedding must be a (debug_watermark, info_watermark) tuple"
+        ) from None
+    for mark in (debug_mark, info_mark):
+        if not isinstance(mark, int) or isinstance(mark, bool) or mark <= 0:
+            raise ValueError("load_shedding watermarks must be positive integers")
+    if info_mark < debug_mark:
+        raise ValueError(
+            "load_shedding info watermark must be greater than or equal to "
+            "the debug watermark"
+        )
+    return debug_mark, info_mark
+
+
+class LogurichQueue(multiprocessing.queues.Queue):
+    """Multiprocessing queue carrying shared logurich transport state.
+
+    The extra state travels with the queue when it is handed to a child
+    process, so ``configure_child_logging(queue)`` picks it up without any
+    additional arguments. It holds the optional backlog counter used for load
+    shedding and the parent's level table, published in shared memory so that
+    producers can filter records before enqueueing them.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        *,
+        ctx: Optional[Any] = None,
+        shed_watermarks: Optional[tuple[int, int]] = None,
+    ) -> None:
+        ctx = ctx if ctx is not None else mp.get_context()
+        super().__init__(maxsize, ctx=ctx)
+        self.shed_watermarks = (
+            _validate_watermarks(shed_watermarks)
+            if shed_watermarks is not None
+            else None
+        )
+        self._backlog = ctx.Value("q", 0) if self.shed_watermarks else None
+        self._levels_version = ctx.Value("q", 0, lock=False)
+        self._levels_table = ctx.Array("c", LEVEL_TABLE_SIZE)
+        self.synchronous = False
+        self._can_put_synchronously = self._has_put_internals()
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        return (
+            super().__getstate__(),
+            self.shed_watermarks,
+            self._backlog,
+            self._levels_version,
+            self._levels_table,
+        )
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        (
+            base_state,
+            self.shed_watermarks,
+            self._backlog,
+            self._levels_version,
+            self._levels_table,
+        ) = state
+        super().__setstate__(base_state)
+        self.synchronous = False
+        self._can_put_synchronously = self._has_put_internals()
+
+    def _has_put_internals(self) -> bool:
+        return all(hasattr(self, name) for name in _SYNCHRONOUS_PUT_ATTRIBUTES)
+
+    def put(self, obj: Any, block: bool = True, timeout: Optional[float] = None):
+        if self.synchronous and self._can_put_synchronously:
+            self._put_synchronous(obj, block, timeout)
+        else:
+            super().put(obj, block, timeout)
+        if self._backlog is not None:
+            with self._backlog.get_lock():
+                self._backlog.value += 1
+
+    def _put_synchronous(self, obj: Any, block: bool, timeout: Optional[float]) -> None:
+        # Write from the calling thread instead of the feeder thread, so a
+        # record is in the pipe once the log call returns. A worker terminated
+        # right after finishing its task then cannot die while its feeder
+        # thread holds the shared write lock.
+        # This mirrors CPython's Queue.put on its private _closed, _sem,
+        # _wlock and _send_bytes attributes; without them, put() falls back
+        # to the feeder thread.
+        if self._closed:
+            raise ValueError(f"Queue {self!r} is closed")
+        if not self._sem.acquire(block, timeout):
+            raise queue_module.Full
+        data = ForkingPickler.dumps(obj)
+        if self._wlock is None:
+            self._send_bytes(data)
+        else:
+            with self._wlock:
+                self._send_bytes(data)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        obj = super().get(block, timeout)
+        if self._backlog is not None:
+            with self._backlog.get_lock():
+                self._backlog.value -= 1
+        return obj
+
+    def backlog(self) -> int:
+        """Return the number of records enqueued but not yet consumed."""
+
+        if self._backlog is None:
+            return 0
+        # Unlocked read: a slightly stale value is fine for watermark checks.
+        return self._backlog.get_obj().value
+
+    def publish_levels(
+        self,
+        min_level: Optional[int],
+        level_by_module: Optional[dict[str, int]],
+        sink_level: Optional[int] = None,
+    ) -> None:
+        """Publish the level table read by producers through :meth:`read_levels`."""
+
+        data = json.dumps(
+            {
+                "min_level": min_level,
+                "modules": level_by_module or {},
+                "sink_level": sink_level,
+            }
+        )
+        encoded = data.encode("utf-8")
+        if len(encoded) >= LEVEL_TABLE_SIZE:
+            raise ValueError("level_by_module table is too large to share")
+        with self._levels_table.get_lock():
+            self._levels_table.value = encoded
+            self._levels_version.value += 1
+
+    def levels_version(self) -> int:
+        """Return the version of the published level table (0 if never published)."""
+
+        return self._levels_version.value
+
+    def read_levels(
+        self,
+    ) -> tuple[int, Optional[int], Optional[dict[str, int]], Optional[int]]:
+        """Return ``(version, min_level, level_by_module, sink_level)``."""
+
+        with self._levels_table.get_lock():
+            version = self._levels_version.value
+            data = self._levels_table.value
+        if not data:
+            return version, None, None, None
+        table = json.loads(data)
+        return (
+            version,
+            table["min_level"],
+            table["modules"] or None,
+            table["sink_level"],
+        )
+
+
+class LoadShedder:
+    """Track the producer-side minimum level raised by queue backlog.
+
+    Crossing the debug watermark drops ``DEBUG`` records, crossing the info
+    watermark drops ``INFO`` records as well. Each step is restored once the
+    backlog drains below half of the watermark that triggered it. Producer
+    threads share one shedder, so each transition is reported once and every
+    dropped record is counted.
+    """
+
+    def __init__(self, debug_watermark: int, info_watermark: int) -> None:
+        self.debug_watermark = debug_watermark
+        self.info_watermark = info_watermark
+        self.level = logging.NOTSET
+        self.dropped: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _target_level(self, backlog: int) -> int:
+        if backlog >= self.info_watermark or (
+            self.level >= logging.WARNING and backlog >= self.info_watermark // 2
+        ):
+            return logging.WARNING
+        if backlog >= self.debug_watermark or (
+            self.level >= logging.INFO and backlog >= self.debug_watermark // 2
+        ):
+            return logging.INFO
+        return logging.NOTSET
+
+    def update(self, backlog: int) -> Optional[tuple[int, int]]:
+        """Recompute the shedding level; return ``(old, new)`` on change."""
+
+        with self._lock:
+            target = self._target_level(backlog)
+            if target == self.level:
+                return None
+            previous = self.level
+            self.level = target
+            return previous, target
+
+    def admit(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        with self._lock:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+        return False
+
+    def pop_dropped(self) -> dict[str, int]:
+        with self._lock:
+            dropped, self.dropped = self.dropped, {}
+        return dropped
+
+
+def stamp_record(record: logging.LogRecord) -> None:
+    """Stamp a producer sequence number and nanosecond timestamp on *record*."""
+
+    if not hasattr(record, "_logurich_seq"):
+        record._logurich_seq = next(_SEQUENCE)
+        record._logurich_created_ns = time.time_ns()
+
+
+class LogurichQueueListener(logging.handlers.QueueListener):
+    """Queue listener with an optional bounded reorder window.
+
+    Records from several producers arrive in queue order. With a
+    ``reorder_window`` (seconds), records are held at most that long after
+    their creation and emitted in creation order. At most ``max_buffered``
+    records are held; beyond that the oldest one is emitted immediately.
+    """
+
+    max_buffered = 10_000
+
+    def __init__(
+        self,
+        queue: Any,
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+        reorder_window: Optional[float] = None,
+    ) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        if reorder_window is not None and reorder_window <= 0:
+            raise ValueError("reorder_window must be a positive number of seconds")
+        self.reorder_window = reorder_window
+        self._arrival = itertools.count()
+
+    def _sort_key(self, record: logging.LogRecord) -> tuple[int, int, int, int]:
+        created_ns = getattr(record, "_logurich_created_ns", None)
+        if created_ns is None:
+            created_ns = int(record.created * 1_000_000_000)
+        return (
+            created_ns,
+            record.process or 0,
+            getattr(record, "_logurich_seq", 0),
+            next(self._arrival),
+        )
+
+    def _monitor(self) -> None:
+        if self.reorder_window is None:
+            super()._monitor()
+            return
+
+        window_ns = int(self.reorder_window * 1_000_000_000)
+        pending: list[tuple[tuple[int, int, int, int], logging.LogRecord]] = []
+        while True:
+            timeout = None
+            if pending:
+                due_ns = pending[0][0][0] + window_ns
+                timeout = max(0.0, (due_ns - time.time_ns()) / 1_000_000_000)
+            try:
+                record = self.queue.get(True, timeout)
+            except queue_module.Empty:
+                record = _NO_RECORD
+            if record is self._sentinel:
+                while pending:
+                    self.handle(heapq.heappop(pending)[1])
+                break
+            if record is not _NO_RECORD:
+                heapq.heappush(pending, (self._sort_key(record), record))
+                if len(pending) > self.max_buffered:
+                    self.handle(heapq.heappop(pending)[1])
+            now_ns = time.time_ns()
+            while pending and pending[0][0][0] + window_ns <= now_ns:
+                self.handle(heapq.heappop(pending)[1])
@@ -14,3 +14,11 @@ def parse_bool_env(name: str) -> Optional[bool]:
     if normalized in {"0", "false", "no", "off", ""}:
         return False
     return None
+
+
+def context_display_name(name: str) -> str:
+    """Return a context key without its ``context::`` prefix."""
+
+    if name.startswith("context::"):
+        return name.split("::", 1)[1]
+    return name
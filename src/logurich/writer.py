@@ -0,0 +1,201 @@
+"""Batched and non-blocking writes of rendered log output to the console."""
+
+from __future__ import annotations
+
+import threading
+from typing import Literal, Optional, Union
+
+from rich.console import Console
+
+DEFAULT_FLUSH_SIZE = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_MAX_PENDING = 1024 * 1024
+OverflowPolicy = Literal["drop", "summarize"]
+
+
+class BufferedConsoleWriter:
+    """Accumulate rendered output and write it to the console in batches.
+
+    Pending text is written with a single ``write`` and ``flush`` once it
+    reaches ``flush_size`` characters, once the oldest pending text is
+    ``flush_interval`` seconds old, or immediately when :meth:`write` is
+    called with ``flush=True``. The stream is looked up on the console at
+    flush time, so reconfiguring the console redirects pending output too.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        *,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        if flush_size <= 0:
+            raise ValueError("flush_size must be a positive number of characters")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be a positive number of seconds")
+        self.console = console
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, text: str, *, flush: bool = False) -> None:
+        """Queue *text*; write the batch now if *flush* or the size limit is hit."""
+
+        if not text and not flush:
+            return
+        with self._lock:
+            self._pending.append(text)
+            self._pending_size += len(text)
+            if flush or self._pending_size >= self.flush_size:
+                self._flush_locked()
+                return
+            if len(self._pending) == 1:
+                self._ensure_thread()
+                self._wakeup.set()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Write pending output and stop the flush thread."""
+
+        self._closed.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        stream = self.console.file
+        stream.write(data)
+        stream.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="logurich-console-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed.wait(self.flush_interval):
+                break
+            with self._lock:
+                self._flush_locked()
+
+
+class NonBlockingConsoleWriter:
+    """Write rendered output from a dedicated thread with a bounded buffer.
+
+    :meth:`write` never blocks on the console stream: text is queued and a
+    writer thread performs the (possibly blocking) writes. When more than
+    ``max_pending`` characters are waiting, new text is dropped. With the
+    ``"summarize"`` overflow policy a line reporting the number of dropped
+    records is written once the backlog has been written out.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        *,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        overflow: OverflowPolicy = "drop",
+        close_timeout: float = 2.0,
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be a positive number of characters")
+        if overflow not in ("drop", "summarize"):
+            raise ValueError("overflow must be 'drop' or 'summarize'")
+        self.console = console
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.close_timeout = close_timeout
+        self.dropped_total = 0
+        self._dropped = 0
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._closing = False
+        self._condition = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, text: str, *, flush: bool = False) -> None:
+        """Queue *text* without blocking, dropping it if the buffer is full."""
+
+        if not text:
+            return
+        with self._condition:
+            if self._pending_size + len(text) > self.max_pending:
+                self._dropped += 1
+                self.dropped_total += 1
+                return
+            self._pending.append(text)
+            self._pending_size += len(text)
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(
+                    target=self._run, name="logurich-console-writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self) -> None:
+        # Output is written as soon as the writer thread is free; waiting for
+        # it here would reintroduce the blocking this writer avoids.
+        return None
+
+    def close(self) -> None:
+        """Let the writer thread drain for up to ``close_timeout`` seconds."""
+
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.close_timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                data = "".join(self._pending)
+                self._pending.clear()
+                self._pending_size = 0
+                dropped, self._dropped = self._dropped, 0
+            if dropped and self.overflow == "summarize":
+                data += (
+                    f"logurich: dropped {dropped} console record(s), "
+                    "the console could not keep up\n"
+                )
+            try:
+                stream = self.console.file
+                stream.write(data)
+                stream.flush()
+            except Exception:
+                # A broken console must not take the logging thread down;
+                # other sinks still receive the records.
+                pass
+
+
+ConsoleWriter = Union[BufferedConsoleWriter, NonBlockingConsoleWriter]
@@ -1,21 +1,42 @@
+import bz2
+import gzip
 import json
 import logging
+import lzma
+import os
+import re
 import threading
+import time
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from io import StringIO
 from types import MappingProxyType
 
 import pytest
 from rich.panel import Panel
+from rich.text import Text
+from rich.theme import Theme
 
 from logurich import (
     BoundLogger,
+    Sink,
     ctx,
+    filesink,
     global_context_configure,
     global_context_set,
     init_logger,
     shutdown_logger,
 )
-from logurich.console import rich_configure_console
+from logurich.__main__ import main as cli_main
+from logurich.console import rich_configure_console, rich_get_console, rich_to_str
+from logurich.filesink import LogurichFileHandler
+from logurich.handler import LogurichRenderer, TimestampCache
+from logurich.highlight import PatternHighlighter
+from logurich.index import find_time_range, read_index
+from logurich.query import QueryFilter, iter_lines, query, rotated_files, scan_file
 from logurich.struct import logger_state
+from logurich.tail import follow
+from logurich.writer import BufferedConsoleWriter
 
 
 @pytest.mark.parametrize(
@@ -303,6 +324,795 @@ def test_logurich_serialize_stdlib_extra_payload(monkeypatch, buffer):
     assert payload["record"]["extra"]["action"] == "test"
 
 
+def test_logurich_serialize_without_text_skips_plain_rendering(monkeypatch, buffer):
+    monkeypatch.setenv("LOGURICH_SERIALIZE", "1")
+
+    def fail_format_file(self, record):
+        raise AssertionError("plain-text rendering should be skipped")
+
+    monkeypatch.setattr(LogurichRenderer, "format_file", fail_format_file)
+    init_logger("INFO", enqueue=False, serialize_text=False)
+    logging.getLogger("serialize.lean").info("Lean %s", "payload")
+    shutdown_logger()
+
+    payload = json.loads(buffer.getvalue().splitlines()[0])
+    assert "text" not in payload
+    assert payload["record"]["message"] == "Lean payload"
+    assert payload["record"]["file"]["name"] == "test_core.py"
+
+
+def test_json_schema_without_text_skips_plain_rendering(monkeypatch, buffer):
+    monkeypatch.setenv("LOGURICH_SERIALIZE", "1")
+
+    def fail_format_file(self, record):
+        raise AssertionError("plain-text rendering should be skipped")
+
+    monkeypatch.setattr(LogurichRenderer, "format_file", fail_format_file)
+    init_logger(
+        "INFO",
+        enqueue=False,
+        serialize_text=False,
+        json_schema={"ts": "time.timestamp", "lvl": "level.name", "msg": "message"},
+    )
+    logging.getLogger("serialize.schema").info("Lean %s", "schema")
+    shutdown_logger()
+
+    payload = json.loads(buffer.getvalue().splitlines()[0])
+    assert payload["msg"] == "Lean schema"
+    assert payload["lvl"] == "INFO"
+
+
+def test_logurich_serialize_uses_custom_json_dumps(monkeypatch, buffer):
+    monkeypatch.setenv("LOGURICH_SERIALIZE", "1")
+    calls = []
+
+    def dumps(value):
+        calls.append(value)
+        return json.dumps(value, default=str).encode("utf-8")
+
+    init_logger("INFO", enqueue=False, json_dumps=dumps)
+    logging.getLogger("serialize.custom").info("Custom encoder")
+    shutdown_logger()
+
+    payload = json.loads(buffer.getvalue().splitlines()[0])
+    assert payload["record"]["message"] == "Custom encoder"
+    assert "Custom encoder" in calls
+
+
+def test_logurich_serialize_uses_flat_json_schema(monkeypatch, buffer):
+    monkeypatch.setenv("LOGURICH_SERIALIZE", "1")
+    init_logger(
+        "INFO",
+        enqueue=False,
+        json_schema={
+            "ts": "time.timestamp",
+            "lvl": "level.name",
+            "logger": "name",
+            "msg": "message",
+            "user": "extra.user",
+            "*": "extra.*",
+        },
+    )
+    logging.getLogger("serialize.flat").info(
+        "Flat %s",
+        "payload",
+        extra={"user": "alice", "context": {"request_id": ctx("req-1")}},
+    )
+    shutdown_logger()
+
+    payload = json.loads(buffer.getvalue().splitlines()[0])
+    assert list(payload)[:5] == ["ts", "lvl", "logger", "msg", "user"]
+    assert payload["lvl"] == "INFO"
+    assert payload["logger"] == "serialize.flat"
+    assert payload["msg"] == "Flat payload"
+    assert payload["request_id"] == "req-1"
+    assert isinstance(payload["ts"], float)
+
+
+def test_json_schema_spread_does_not_duplicate_schema_keys(monkeypatch, buffer):
+    monkeypatch.setenv("LOGURICH_SERIALIZE", "1")
+    init_logger(
+        "INFO",
+        enqueue=False,
+        json_schema={"msg": "message", "lvl": "level.name", "rest": "extra.*"},
+    )
+    logging.getLogger("serialize.spread").info(
+        "hello", extra={"context": {"msg": ctx("ctx"), "user": ctx("alice")}}
+    )
+    shutdown_logger()
+
+    line = buffer.getvalue().splitlines()[0]
+    pairs = json.loads(line, object_pairs_hook=list)
+    assert [key for key, _ in pairs] == ["msg", "lvl", "extra.msg", "user"]
+    assert dict(pairs) == {
+        "msg": "hello",
+        "lvl": "INFO",
+        "extra.msg": "ctx",
+        "user": "alice",
+    }
+
+
+def test_json_schema_rejects_unknown_source():
+    with pytest.raises(ValueError, match="Unknown json_schema source"):
+        init_logger("INFO", enqueue=False, json_schema={"lvl": "level.label"})
+
+
+@pytest.mark.parametrize("rich_handler", [False, True])
+def test_buffered_console_flushes_on_error_and_shutdown(buffer, rich_handler):
+    init_logger(
+        "INFO",
+        enqueue=False,
+        rich_handler=rich_handler,
+        console_flush_interval=60,
+    )
+    log = logging.getLogger("buffered.console")
+
+    log.info("First batched")
+    log.info("Second batched")
+    assert buffer.getvalue() == ""
+
+    log.error("Flushed immediately")
+    output = buffer.getvalue()
+    assert output.index("First batched") < output.index("Flushed immediately")
+
+    log.info("Pending at shutdown")
+    assert "Pending at shutdown" not in buffer.getvalue()
+    shutdown_logger()
+    assert "Pending at shutdown" in buffer.getvalue()
+
+
+def test_buffered_console_keeps_rich_renderables_in_order(buffer):
+    stream = StringIO()
+    rich_configure_console(
+        file=stream, width=120, force_terminal=True, color_system="truecolor"
+    )
+    init_logger("INFO", enqueue=False, console_flush_interval=60)
+    logging.getLogger("buffered.rich").info(
+        "With table", extra={"renderables": ({"key": 1},)}
+    )
+    shutdown_logger()
+
+    lines = Text.from_ansi(stream.getvalue()).plain.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("| With table")
+    assert "# {'key': 1}" in lines[1]
+
+
+def test_offscreen_rendering_uses_the_configured_theme():
+    rich_configure_console(
+        file=StringIO(),
+        width=120,
+        force_terminal=True,
+        color_system="truecolor",
+        theme=Theme({"alert": "bold red"}),
+        emoji=False,
+    )
+
+    rendered = rich_to_str("[alert]down[/alert] :thumbs_up:")
+    assert "\x1b[1;31mdown" in rendered
+    assert Text.from_ansi(rendered).plain == "down :thumbs_up:"
+
+
+def test_buffered_console_writer_flushes_by_interval_and_size(buffer):
+    console = rich_get_console()
+    writer = BufferedConsoleWriter(console, flush_size=10, flush_interval=0.01)
+    try:
+        writer.write("tick\n")
+        deadline = time.monotonic() + 2
+        while "tick" not in buffer.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.getvalue() == "tick\n"
+
+        writer.write("a long enough line\n")
+        assert buffer.getvalue().endswith("a long enough line\n")
+    finally:
+        writer.close()
+
+
+def test_pattern_highlighter_applies_selected_patterns_in_one_pass():
+    highlighter = PatternHighlighter(["numbers", "uuids"])
+    text = highlighter(
+        "job 123e4567-e89b-12d3-a456-426614174000 took 42 ms in /tmp/run.log"
+    )
+
+    styles = {text.plain[span.start : span.end]: span.style for span in text.spans}
+    assert styles == {
+        "123e4567-e89b-12d3-a456-426614174000": "repr.uuid",
+        "42": "repr.number",
+    }
+    with pytest.raises(ValueError, match="Unknown highlight pattern"):
+        PatternHighlighter(["colors"])
+
+
+def test_highlighting_skips_messages_over_max_length(buffer):
+    rich_configure_console(
+        file=buffer, width=120, force_terminal=True, color_system="truecolor"
+    )
+    init_logger(
+        "INFO",
+        enqueue=False,
+        highlight=True,
+        highlight_patterns=["numbers"],
+        highlight_max_length=20,
+    )
+    log = logging.getLogger("highlight.bounded")
+    log.info("short 42")
+    log.info("a much longer message with 42 in it")
+    shutdown_logger()
+
+    short_line, long_line = buffer.getvalue().splitlines()
+    assert "\x1b[1;36m42" in short_line
+    assert "with 42 in" in long_line
+
+
+class _StalledStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(timeout=5)
+        return super().write(text)
+
+
+@pytest.mark.parametrize(
+    ("rich_handler", "plain_console"), [(False, None), (False, False), (True, None)]
+)
+def test_nonblocking_console_drops_and_summarizes_when_stalled(
+    buffer, rich_handler, plain_console
+):
+    stream = _StalledStream()
+    rich_configure_console(file=stream, width=120)
+    init_logger(
+        "INFO",
+        enqueue=False,
+        rich_handler=rich_handler,
+        plain_console=plain_console,
+        console_overflow="summarize",
+    )
+    handler = logger_state["final_handlers"][0]
+    handler.writer.max_pending = 200
+    log = logging.getLogger("nonblocking.console")
+
+    started = time.monotonic()
+    for index in range(50):
+        log.info("Record %d", index)
+    assert time.monotonic() - started < 2
+
+    stream.release.set()
+    shutdown_logger()
+
+    output = stream.getvalue()
+    written = len(re.findall(r"Record \d+", output))
+    assert handler.writer.dropped_total > 0
+    assert written + handler.writer.dropped_total == 50
+    reported = re.findall(r"dropped (\d+) console record\(s\)", output)
+    assert sum(int(count) for count in reported) == handler.writer.dropped_total
+
+
+def test_file_sink_formats_each_record_once_and_rotates_by_size(tmp_path, buffer):
+    init_logger(
+        "INFO",
+        log_filename="app.log",
+        log_folder=str(tmp_path),
+        enqueue=False,
+        rotation=300,
+        retention=2,
+    )
+    handler = logger_state["final_handlers"][1]
+    formatter = handler.formatter
+    calls = []
+    original_format = formatter.format
+
+    def counting_format(record):
+        calls.append(record)
+        return original_format(record)
+
+    formatter.format = counting_format
+    log = logging.getLogger("file.sink")
+    for index in range(20):
+        log.info("File record %02d", index)
+    shutdown_logger()
+
+    assert len(calls) == 20
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "app.log",
+        "app.log.1",
+        "app.log.2",
+    ]
+    for path in tmp_path.iterdir():
+        assert path.stat().st_size < 300
+    assert "File record 19" in (tmp_path / "app.log").read_text(encoding="utf-8")
+
+
+def test_buffered_file_sink_flushes_on_error_and_shutdown(tmp_path, monkeypatch):
+    fsyncs = []
+    monkeypatch.setattr(filesink.os, "fsync", fsyncs.append)
+    init_logger(
+        "INFO",
+        log_filename="app.log",
+        log_folder=str(tmp_path),
+        enqueue=False,
+        rotation=None,
+        file_flush_interval=60,
+        file_fsync_interval=60,
+    )
+    log_file = tmp_path / "app.log"
+    log = logging.getLogger("file.buffered")
+
+    log.info("Buffered record")
+    assert log_file.read_text(encoding="utf-8") == ""
+
+    log.error("Error record")
+    assert "Buffered record" in log_file.read_text(encoding="utf-8")
+    assert "Error record" in log_file.read_text(encoding="utf-8")
+    assert fsyncs == []
+
+    log.info("Pending record")
+    shutdown_logger()
+    assert "Pending record" in log_file.read_text(encoding="utf-8")
+    assert len(fsyncs) == 1
+
+
+@pytest.mark.parametrize(
+    ("compression", "opener"),
+    [("gzip", gzip.open), ("bz2", bz2.open), ("lzma", lzma.open)],
+)
+def test_file_sink_compresses_rotated_backups(tmp_path, compression, opener):
+    handler = LogurichFileHandler(
+        tmp_path / "app.log", max_bytes=100, backup_count=2, compression=compression
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for index in range(8):
+        handler.handle(logging.makeLogRecord({"msg": f"record {index:02d} " * 3}))
+    handler.close()
+
+    extension = filesink.COMPRESSION_EXTENSIONS[compression]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "app.log",
+        f"app.log.1{extension}",
+        f"app.log.2{extension}",
+    ]
+    with opener(tmp_path / f"app.log.1{extension}", "rt", encoding="utf-8") as f:
+        assert f.read().splitlines()[-1].startswith("record 05")
+
+
+def test_file_sink_rollover_does_not_wait_for_compression(tmp_path, monkeypatch):
+    release = threading.Event()
+    compress_stream = filesink._compress_stream
+
+    def stalled(*args):
+        assert release.wait(5)
+        compress_stream(*args)
+
+    monkeypatch.setattr(filesink, "_compress_stream", stalled)
+    handler = LogurichFileHandler(
+        tmp_path / "app.log", max_bytes=100, backup_count=3, compression="gzip"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    started = time.monotonic()
+    for index in range(12):
+        handler.handle(logging.makeLogRecord({"msg": f"record {index:02d} " * 3}))
+    assert time.monotonic() - started < 2
+    assert not list(tmp_path.glob("app.log.*.gz"))
+
+    release.set()
+    handler.close()
+    backups = sorted(path.name for path in tmp_path.iterdir() if path.name != "app.log")
+    assert backups == ["app.log.1.gz", "app.log.2.gz", "app.log.3.gz"]
+    assert handler._backup_bytes == sum(
+        (tmp_path / name).stat().st_size for name in backups
+    )
+
+
+def test_file_sink_combines_size_and_time_rotation(tmp_path):
+    handler = LogurichFileHandler(
+        tmp_path / "app.log", max_bytes=100, interval=timedelta(hours=1)
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for index in range(4):
+        handler.handle(logging.makeLogRecord({"msg": f"record {index:02d} " * 3}))
+    handler._rollover_at = time.time() - 1
+    handler.handle(logging.makeLogRecord({"msg": "after interval"}))
+    handler.close()
+
+    backups = sorted(path.name for path in tmp_path.iterdir() if path.name != "app.log")
+    assert len(backups) == 2
+    assert all(
+        re.fullmatch(r"app\.log\.\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}(-\d+)?", name)
+        for name in backups
+    )
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == "after interval\n"
+    assert handler._rollover_at > time.time()
+
+
+def test_file_sink_retention_by_bytes_and_age_without_rescanning(tmp_path, monkeypatch):
+    stale = tmp_path / "app.log.9"
+    stale.write_text("stale\n", encoding="utf-8")
+    old = time.time() - 3 * 86400
+    os.utime(stale, (old, old))
+    handler = LogurichFileHandler(
+        tmp_path / "app.log",
+        max_bytes=100,
+        max_backup_bytes=200,
+        max_backup_age=timedelta(days=1),
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def no_scan(*args):
+        raise AssertionError("backups must not be rescanned on rollover")
+
+    monkeypatch.setattr(filesink.os, "scandir", no_scan)
+    monkeypatch.setattr(filesink.os, "listdir", no_scan)
+    for index in range(20):
+        handler.handle(logging.makeLogRecord({"msg": f"record {index:02d} " * 3}))
+    handler.close()
+    monkeypatch.undo()
+
+    backups = [path for path in tmp_path.iterdir() if path.name != "app.log"]
+    assert not stale.exists()
+    assert sum(path.stat().st_size for path in backups) <= 200
+    assert sorted(path.name for path in backups) == ["app.log.1", "app.log.2"]
+    assert handler._backup_bytes == sum(path.stat().st_size for path in backups)
+
+
+def test_sinks_route_records_and_format_once_per_format(tmp_path, buffer):
+    init_logger(
+        "DEBUG",
+        log_filename="all.log",
+        log_folder=str(tmp_path),
+        enqueue=False,
+        sinks=[
+            Sink("db.log", modules=["app.db"]),
+            Sink("errors.log", level="ERROR"),
+            Sink("tenant.jsonl", context={"tenant": "acme"}, serialize=True),
+        ],
+    )
+    router = logger_state["final_handlers"][1]
+    calls = []
+    for formatter in {id(h.formatter): h.formatter for h in router.handlers}.values():
+        original = formatter.format
+        formatter.format = lambda record, original=original: (
+            calls.append(record) or original(record)
+        )
+
+    logging.getLogger("app.db").info("query ran")
+    logging.getLogger("app.dbx").error("not the db logger")
+    with global_context_configure(tenant="acme"):
+        logging.getLogger("app.api").info("tenant request")
+    shutdown_logger()
+
+    def lines(name):
+        return (tmp_path / name).read_text(encoding="utf-8").splitlines()
+
+    assert len(lines("all.log")) == 3
+    assert [line.endswith("query ran") for line in lines("db.log")] == [True]
+    assert [line.endswith("not the db logger") for line in lines("errors.log")] == [
+        True
+    ]
+    (payload,) = [json.loads(line) for line in lines("tenant.jsonl")]
+    assert payload["record"]["message"] == "tenant request"
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize("enqueue", [False, True])
+def test_sink_level_below_global_level(tmp_path, buffer, enqueue):
+    init_logger(
+        "INFO",
+        log_filename="app.log",
+        log_folder=str(tmp_path),
+        enqueue=enqueue,
+        sinks=[Sink("debug.log", level="DEBUG", modules=["db"]), Sink("all.log")],
+    )
+    logging.getLogger("db.pool").debug("pool checkout")
+    logging.getLogger("api").debug("api debug")
+    logging.getLogger("api").info("api info")
+    shutdown_logger()
+
+    def messages(name):
+        lines = (tmp_path / name).read_text(encoding="utf-8").splitlines()
+        return [line.rsplit(" | ", 1)[1] for line in lines]
+
+    assert messages("debug.log") == ["pool checkout"]
+    assert messages("app.log") == ["api info"]
+    assert messages("all.log") == ["api info"]
+    assert "pool checkout" not in buffer.getvalue()
+    assert "api info" in buffer.getvalue()
+
+
+def test_file_sink_time_index_seeks_to_time_range(tmp_path):
+    handler = LogurichFileHandler(
+        tmp_path / "app.log", max_bytes=800, backup_count=1, index_every=10
+    )
+    handler.setFormatter(logging.Formatter("%(created).0f %(levelname)s"))
+    base = 1_700_000_000
+    for index in range(100):
+        level = logging.ERROR if index % 25 == 0 else logging.INFO
+        handler.handle(
+            logging.makeLogRecord(
+                {"created": base + index, "levelno": level, "levelname": "L"}
+            )
+        )
+    handler.close()
+
+    assert (tmp_path / "app.log.1.idx").exists()
+    entries = read_index(tmp_path / "app.log")
+    assert entries[0].offset == 0
+    first_created = int((tmp_path / "app.log").read_text().split()[0])
+    assert entries[0].first_time == first_created
+    assert sum(sum(entry.counts) for entry in entries) == base + 100 - first_created
+
+    first, last = find_time_range(entries, base + 85, base + 88)
+    with open(tmp_path / "app.log", "rb") as f:
+        f.seek(first)
+        chunk = f.read(None if last is None else last - first).decode()
+    times = [int(line.split()[0]) for line in chunk.splitlines()]
+    assert times[0] <= base + 85 and base + 88 <= times[-1]
+    assert len(times) <= 20
+
+    backup_entries = read_index(tmp_path / "app.log.1")
+    counts = [entry.level_counts() for entry in backup_entries]
+    assert sum(count["ERROR"] for count in counts) >= 1
+
+
+def test_time_index_keeps_records_written_before_indexing(tmp_path):
+    path = tmp_path / "app.log"
+    base = 1_700_000_000
+    path.write_text(
+        "".join(f"{base + index} unindexed\n" for index in range(5)), encoding="utf-8"
+    )
+    handler = LogurichFileHandler(path, index_every=5)
+    handler.setFormatter(logging.Formatter("%(created).0f indexed"))
+    for index in range(5, 30):
+        handler.handle(
+            logging.makeLogRecord({"created": base + index, "levelno": logging.INFO})
+        )
+    handler.close()
+
+    entries = read_index(path)
+    assert entries[0].offset > 0
+    first, last = find_time_range(entries, base + 20, base + 22)
+    assert first == 0
+    with open(path, "rb") as f:
+        chunk = f.read(None if last is None else last - first).decode()
+    assert chunk.startswith(f"{base} unindexed\n")
+    assert f"{base + 22} indexed" in chunk
+
+
+def test_file_sink_rotates_at_time_with_dated_backups(tmp_path):
+    for day in ("2024-01-01", "2024-01-02"):
+        (tmp_path / f"app.log.{day}").write_text("old\n", encoding="utf-8")
+    handler = LogurichFileHandler(
+        tmp_path / "app.log", at_time=dt_time(12, 0), backup_count=2
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    record = logging.makeLogRecord({"msg": "before"})
+    handler.handle(record)
+
+    rollover_at = datetime(2024, 1, 4, 12, 0).timestamp()
+    handler._rollover_at = rollover_at
+    handler.do_rollover(rollover_at + 1)
+    handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "app.log",
+        "app.log.2024-01-02",
+        "app.log.2024-01-03",
+    ]
+    assert (tmp_path / "app.log.2024-01-03").read_text(encoding="utf-8") == "before\n"
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == ""
+    assert handler._rollover_at == datetime(2024, 1, 5, 12, 0).timestamp()
+
+
+def test_file_sink_keeps_dated_backups_rotated_on_the_same_day(tmp_path):
+    handler = LogurichFileHandler(
+        tmp_path / "app.log",
+        at_time=dt_time(12, 0),
+        backup_count=3,
+        compression="gzip",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    # Forced rollovers before the scheduled one all back up the same day.
+    rollover_at = handler._rollover_at
+    for message in ("first", "second", "third"):
+        handler.handle(logging.makeLogRecord({"msg": message}))
+        handler.do_rollover(rollover_at - 10)
+    handler.close()
+
+    day = (datetime.fromtimestamp(rollover_at) - timedelta(days=1)).date()
+    names = [f"app.log.{day}.gz", f"app.log.{day}-1.gz", f"app.log.{day}-2.gz"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["app.log", *names]
+    )
+    for name, message in zip(names, ("first", "second", "third")):
+        with gzip.open(tmp_path / name, "rt", encoding="utf-8") as f:
+            assert f.read() == f"{message}\n"
+
+    reopened = LogurichFileHandler(
+        tmp_path / "app.log", at_time=dt_time(12, 0), backup_count=3
+    )
+    reopened.close()
+    assert [os.path.basename(backup.path) for backup in reopened._backups] == names
+
+
+@pytest.mark.parametrize("log_verbose", [2, 3])
+def test_query_cli_filters_plain_and_json_logs(tmp_path, buffer, capsys, log_verbose):
+    init_logger(
+        "DEBUG",
+        log_verbose=log_verbose,
+        log_filename="app.log",
+        log_folder=str(tmp_path),
+        enqueue=False,
+        rotation=2000,
+        compression="gzip",
+        file_index_every=5,
+        sinks=[Sink("app.jsonl", serialize=True, rotation=None)],
+    )
+
+    def emit():
+        for index in range(60):
+            logger = logging.getLogger("app.db" if index % 2 else "other")
+            logger.log(
+                logging.WARNING if index % 5 == 0 else logging.INFO,
+                "Record %d",
+                index,
+                extra={"context": {"user": ctx(f"u{index % 3}", show_key=True)}},
+            )
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("app.db").exception("Failed")
+
+    # Thread names such as "Thread-1 (emit)" appear in log_verbose=3 sources.
+    thread = threading.Thread(target=emit)
+    thread.start()
+    thread.join()
+    shutdown_logger()
+    assert list(tmp_path.glob("app.log.*.gz"))
+
+    filters = ["--name", "app.db", "-l", "warning", "-c", "user=u1"]
+    assert cli_main(["query", "-r", str(tmp_path / "app.log"), *filters]) == 0
+    plain = capsys.readouterr().out.splitlines()
+    assert [line.split(" | ", 3)[3] for line in plain] == [
+        "[user=u1] Record 25",
+        "[user=u1] Record 55",
+    ]
+
+    assert cli_main(["query", str(tmp_path / "app.jsonl"), *filters]) == 0
+    rendered = capsys.readouterr().out.splitlines()
+    assert [line.split(" | ", 2)[2] for line in rendered] == [
+        "[user=u1] Record 25",
+        "[user=u1] Record 55",
+    ]
+    assert cli_main(["query", "--json", str(tmp_path / "app.jsonl"), *filters]) == 0
+    payloads = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [payload["record"]["message"] for payload in payloads] == [
+        "Record 25",
+        "Record 55",
+    ]
+
+    entries = list(scan_file(str(tmp_path / "app.jsonl"), QueryFilter()))
+    start = entries[40].created
+    recent = list(scan_file(str(tmp_path / "app.jsonl"), QueryFilter(start=start)))
+    assert all(entry.created >= start for entry in recent)
+    assert {f"Record {index}" for index in range(40, 60)} <= {
+        entry.data["record"]["message"] for entry in recent
+    }
+
+    paths = rotated_files(str(tmp_path / "app.log"))
+    sequential = [entry.text for entry in query(paths, QueryFilter())]
+    chunked = query(paths, QueryFilter(), workers=2, chunk_size=256)
+    assert [entry.text for entry in chunked] == sequential
+    assert len(sequential) == 61
+    assert "ValueError: boom" in sequential[-1]
+
+
+def test_compressed_ranges_read_records_to_their_last_line(tmp_path):
+    lines = [
+        b"2024-01-01 12:00:00.000 | ERROR    | Failed",
+        b"Traceback (most recent call last):",
+        b"ValueError: boom",
+        b"2024-01-01 12:00:01.000 | INFO     | Next",
+    ]
+    content = b"".join(line + b"\n" for line in lines)
+    (tmp_path / "app.log").write_bytes(content)
+    with gzip.open(tmp_path / "app.log.gz", "wb") as f:
+        f.write(content)
+
+    # The block ends inside the traceback of its last record.
+    ranges = [(0, len(lines[0]) + 1)]
+    for name in ("app.log", "app.log.gz"):
+        assert list(iter_lines(str(tmp_path / name), ranges)) == lines[:3]
+
+
+def test_query_cli_warns_about_context_filters_on_plain_files(tmp_path, capsys):
+    path = tmp_path / "app.log"
+    path.write_text(
+        "2024-01-01 12:00:00.000 | INFO     | [acme] Record\n", encoding="utf-8"
+    )
+
+    assert cli_main(["query", str(path), "-c", "tenant=acme"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "plain text file, context filters" in captured.err
+
+    assert cli_main(["query", str(path)]) == 0
+    assert capsys.readouterr().err == ""
+
+
+def test_tail_follows_json_log_across_rotation_and_truncation(tmp_path, buffer):
+    path = tmp_path / "app.jsonl"
+    renderer = LogurichRenderer(0)
+
+    def write(indexes, mode="a"):
+        with open(path, mode, encoding="utf-8") as f:
+            for index in indexes:
+                level = logging.WARNING if index % 2 else logging.INFO
+                record = logging.makeLogRecord(
+                    {
+                        "name": "app",
+                        "msg": f"Record {index}",
+                        "levelno": level,
+                        "levelname": logging.getLevelName(level),
+                    }
+                )
+                f.write(f"{renderer.format_json(record)}\n")
+
+    def messages(entries):
+        return [entry.data["record"]["message"] for entry in entries]
+
+    write(range(5))
+    batches = follow(
+        str(path), QueryFilter(level=logging.WARNING), lines=2, poll_interval=0.01
+    )
+    assert messages(next(batches)) == ["Record 1", "Record 3"]
+
+    write(range(5, 8))
+    os.replace(path, tmp_path / "app.jsonl.1")
+    write(range(8, 10))
+    followed = []
+    for _ in range(20):
+        followed += messages(next(batches))
+        if len(followed) == 3:
+            break
+    assert followed == ["Record 5", "Record 7", "Record 9"]
+
+    write([11], mode="w")
+    for _ in range(20):
+        batch = messages(next(batches))
+        if batch:
+            break
+    assert batch == ["Record 11"]
+    batches.close()
+
+    assert cli_main(["tail", str(path), "-n", "1"]) == 0
+    assert buffer.getvalue().endswith(" | WARNING  | Record 11\n")
+
+
+def test_tail_keeps_plain_continuation_lines_across_reads(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("", encoding="utf-8")
+    batches = follow(str(path), QueryFilter(), lines=0, read_size=64)
+    assert next(batches) == []
+
+    traceback_lines = [f'  File "app.py", line {index}, in run' for index in range(5)]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2024-01-01 12:00:00.000 | ERROR    | Failed\n")
+        f.write("".join(f"{line}\n" for line in traceback_lines))
+        f.write("2024-01-01 12:00:01.000 | INFO     | Next\n")
+    entries = []
+    while len(entries) < 2:
+        entries += next(batches)
+    batches.close()
+
+    failed, following = entries
+    assert failed.text.splitlines() == [
+        "2024-01-01 12:00:00.000 | ERROR    | Failed",
+        *traceback_lines,
+    ]
+    assert following.text.endswith("| Next")
+
+
 def test_single_line_messages_preserve_full_text_with_soft_wrap(buffer):
     rich_configure_console(file=buffer, width=65)
     init_logger("INFO", enqueue=False)
@@ -321,6 +1131,75 @@ def test_single_line_messages_preserve_full_text_with_soft_wrap(buffer):
     assert "…" not in lines[0]
 
 
+def test_plain_console_matches_rich_output(buffer):
+    outputs = []
+    for plain_console in (False, True):
+        init_logger("INFO", log_verbose=2, enqueue=False, plain_console=plain_console)
+        logging.getLogger("plain.test").info(
+            "Hello [bold]world[/bold]",
+            extra={"context": {"req": ctx("r-1", style="cyan", show_key=True)}},
+        )
+        shutdown_logger()
+        outputs.append(buffer.getvalue()[23:])
+        buffer.truncate(0)
+        buffer.seek(0)
+
+    assert outputs[0] == outputs[1]
+    assert "[req=r-1] Hello world" in outputs[1]
+
+
+def test_plain_console_is_used_for_non_terminal_output(monkeypatch, buffer):
+    def fail_print(*args, **kwargs):
+        raise AssertionError("Rich printing should be bypassed")
+
+    monkeypatch.setattr(rich_get_console(), "print", fail_print)
+    monkeypatch.setattr(rich_get_console(), "out", fail_print)
+    init_logger("INFO", enqueue=False)
+
+    logging.getLogger("plain.auto").info("Plain output")
+    shutdown_logger()
+
+    assert "| INFO     | Plain output" in buffer.getvalue()
+
+
+@pytest.mark.parametrize("plain_console", [False, True])
+def test_markup_can_be_disabled_per_call_and_per_logger(buffer, plain_console):
+    init_logger("INFO", enqueue=False, plain_console=plain_console)
+    verbatim_logger = logging.getLogger("markup.verbatim")
+    verbatim_logger.markup = False
+    try:
+        logging.getLogger("markup.default").info("parsed [bold]tag[/bold]")
+        logging.getLogger("markup.default").info(
+            "per-call [bold]tag[/bold]", extra={"markup": False}
+        )
+        verbatim_logger.info("per-logger [bold]tag[/bold]")
+    finally:
+        verbatim_logger.markup = True
+    shutdown_logger()
+
+    output = buffer.getvalue()
+    assert "parsed tag" in output
+    assert "per-call [bold]tag[/bold]" in output
+    assert "per-logger [bold]tag[/bold]" in output
+
+
+def test_markup_free_messages_skip_markup_parsing(monkeypatch):
+    def fail_from_markup(*args, **kwargs):
+        raise AssertionError("markup parser should not run")
+
+    monkeypatch.setattr("logurich.handler.Text.from_markup", fail_from_markup)
+    record = logging.makeLogRecord({"msg": "no markup here, value=42"})
+
+    assert LogurichRenderer(0).message_plain(record) == "no markup here, value=42"
+    assert LogurichRenderer(0).message_text(record).plain == (
+        "no markup here, value=42"
+    )
+
+    emoji = logging.makeLogRecord({"msg": "done at 12:30 :thumbs_up:"})
+    assert LogurichRenderer(0).message_plain(emoji) == "done at 12:30 \U0001f44d"
+    assert LogurichRenderer(0).message_text(emoji).plain == ("done at 12:30 \U0001f44d")
+
+
 def test_level_by_module_filters_named_loggers(buffer):
     init_logger(
         "INFO",
@@ -533,3 +1412,16 @@ def test_bind_process_copies_read_only_extra_mapping(logger):
         "context::module": ctx("PM-API", style="magenta", show_key=True),
         "request_id": ctx("req-42", style="cyan", show_key=True),
     }
+
+
+@pytest.mark.parametrize(
+    "created",
+    [1700000000.0, 1700000000.0004, 1700000000.9999996, 1700000059.123456],
+)
+def test_timestamp_cache_matches_datetime_formatting(created):
+    cache = TimestampCache()
+    expected = datetime.fromtimestamp(created)
+
+    assert cache.prefix(created) == expected.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    assert cache.isoformat(created) == expected.astimezone().isoformat()
+    assert cache.local_datetime(created) == expected
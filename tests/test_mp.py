@@ -4,6 +4,8 @@ import os
 import subprocess
 import sys
 import textwrap
+import threading
+import time
 from pathlib import Path
 
 from rich.panel import Panel
@@ -15,8 +17,13 @@ from logurich import (
     get_log_queue,
     global_context_configure,
     init_logger,
+    set_log_level,
     shutdown_logger,
+    transport,
 )
+from logurich.core import _LogurichQueueHandler
+from logurich.struct import logger_state
+from logurich.transport import LoadShedder, LogurichQueue, LogurichQueueListener
 
 
 def worker_process(queue):
@@ -43,6 +50,17 @@ def worker_with_rich_logging(queue):
     )
 
 
+def worker_following_parent_levels(queue, published, resume):
+    configure_child_logging(queue)
+    worker_logger = logging.getLogger("workers.levels")
+    worker_logger.debug("hidden debug")
+    assert logger_state["min_level"] == logging.WARNING
+    published.set()
+    assert resume.wait(10)
+    worker_logger.debug("visible debug")
+    assert logger_state["min_level"] == logging.DEBUG
+
+
 def test_configure_child_logging_routes_records_to_parent(buffer):
     init_logger("DEBUG", enqueue=True)
     log_queue = get_log_queue()
@@ -73,6 +91,29 @@ def test_child_process_context_is_rendered(buffer):
     assert "task_id=task-id" in buffer.getvalue()
 
 
+def test_child_process_follows_parent_levels(buffer):
+    init_logger("WARNING", enqueue=True)
+    log_queue = get_log_queue()
+    published = mp.Event()
+    resume = mp.Event()
+
+    process = mp.Process(
+        target=worker_following_parent_levels,
+        args=(log_queue, published, resume),
+    )
+    process.start()
+    assert published.wait(30)
+    set_log_level("DEBUG")
+    resume.set()
+    process.join(30)
+    assert process.exitcode == 0
+
+    shutdown_logger()
+    output = buffer.getvalue()
+    assert "hidden debug" not in output
+    assert "visible debug" in output
+
+
 def test_rich_logging_in_child_process(buffer):
     init_logger("DEBUG", enqueue=True)
     log_queue = get_log_queue()
@@ -197,3 +238,136 @@ def test_spawn_pool_initializer_can_configure_child_logging(tmp_path):
     )
 
     assert result.returncode == 0, result.stderr or result.stdout
+    for item in (1, 2, 3):
+        assert f"Pool item {item}" in result.stdout
+
+
+def test_load_shedding_drops_low_levels_until_backlog_drains():
+    queue = LogurichQueue(shed_watermarks=(2, 4))
+    handler = _LogurichQueueHandler(queue)
+    shed_logger = logging.getLogger("tests.shedding")
+    shed_logger.addHandler(handler)
+    shed_logger.propagate = False
+    try:
+        for index in range(6):
+            shed_logger.debug("debug %s", index)
+        for index in range(4):
+            shed_logger.info("info %s", index)
+        shed_logger.error("still delivered")
+
+        backlog = []
+        while queue.backlog():
+            backlog.append(queue.get(timeout=5).getMessage())
+        assert backlog[:2] == ["debug 0", "debug 1"]
+        assert "dropping records below INFO" in backlog[2]
+        assert "info 0" in backlog
+        assert "dropping records below WARNING" in backlog[-2]
+        assert backlog[-1] == "still delivered"
+        assert not any(message.startswith("debug 2") for message in backlog)
+
+        shed_logger.debug("after drain")
+        summary = queue.get(timeout=5).getMessage()
+        assert "all levels restored" in summary
+        assert "DEBUG=4" in summary
+        assert queue.get(timeout=5).getMessage() == "after drain"
+    finally:
+        shed_logger.removeHandler(handler)
+        shed_logger.propagate = True
+        queue.close()
+        queue.join_thread()
+
+
+def test_load_shedder_reports_each_transition_once_across_threads():
+    shedder = LoadShedder(2, 4)
+    barrier = threading.Barrier(8)
+    transitions = []
+    record = logging.makeLogRecord({"levelno": logging.DEBUG, "levelname": "DEBUG"})
+
+    def produce():
+        barrier.wait()
+        transition = shedder.update(5)
+        if transition is not None:
+            transitions.append(transition)
+        for _ in range(5000):
+            shedder.admit(record)
+
+    threads = [threading.Thread(target=produce) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert transitions == [(logging.NOTSET, logging.WARNING)]
+    assert shedder.pop_dropped() == {"DEBUG": 40000}
+
+
+def _put_synchronously(queue):
+    # _put_synchronous reimplements Queue.put on these private attributes.
+    for name in ("_sem", "_closed", "_wlock", "_send_bytes"):
+        assert hasattr(queue, name), name
+    queue.synchronous = True
+    queue.put("from spawned child")
+
+
+def test_synchronous_put_works_in_spawned_child():
+    ctx = mp.get_context("spawn")
+    queue = LogurichQueue(ctx=ctx)
+    try:
+        process = ctx.Process(target=_put_synchronously, args=(queue,))
+        process.start()
+        assert queue.get(timeout=30) == "from spawned child"
+        process.join(30)
+        assert process.exitcode == 0
+    finally:
+        queue.close()
+        queue.join_thread()
+
+
+def test_synchronous_put_falls_back_without_queue_internals(monkeypatch):
+    monkeypatch.setattr(
+        transport, "_SYNCHRONOUS_PUT_ATTRIBUTES", ("_missing_internal",)
+    )
+    queue = LogurichQueue()
+    try:
+        queue.synchronous = True
+        queue.put("through the feeder thread")
+        assert queue._thread is not None
+        assert queue.get(timeout=30) == "through the feeder thread"
+    finally:
+        queue.close()
+        queue.join_thread()
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _stamped_record(message, created_ns, seq):
+    record = logging.makeLogRecord({"msg": message})
+    record._logurich_created_ns = created_ns
+    record._logurich_seq = seq
+    return record
+
+
+def test_reorder_window_emits_records_in_creation_order():
+    queue = LogurichQueue()
+    collector = _CollectingHandler()
+    listener = LogurichQueueListener(queue, collector, reorder_window=0.05)
+    now_ns = time.time_ns()
+    for message, offset in (("third", 3), ("first", 1), ("second", 2)):
+        queue.put(_stamped_record(message, now_ns + offset, offset))
+    listener.start()
+
+    deadline = time.monotonic() + 5
+    while len(collector.messages) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    listener.stop()
+    queue.close()
+    queue.join_thread()
+
+    assert collector.messages == ["first", "second", "third"]
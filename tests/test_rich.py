@@ -1,12 +1,32 @@
+import io
 import logging
+import os
 import random
 import re
+import signal
 import string
+import sys
+import threading
 
 import pytest
 from rich.pretty import Pretty
-
-from logurich import init_logger, shutdown_logger
+from rich.table import Table
+from rich.text import Text
+
+from logurich import (
+    ctx,
+    init_logger,
+    rich_configure_console,
+    rich_to_str,
+    shutdown_logger,
+)
+from logurich.console import (
+    LogurichConsole,
+    PrefixedLines,
+    install_resize_handler,
+    rich_console_renderer,
+)
+from logurich.handler import LogurichRenderer
 
 
 def generate_random_dict(k, depth=3):
@@ -94,3 +114,134 @@ def test_root_logger_has_rich_method(buffer):
     output = buffer.getvalue()
     assert "Root title" in output
     assert "root body" in output
+
+
+@pytest.mark.parametrize("verbose", [0, 1, 2, 3])
+def test_precompiled_prefix_matches_markup_prefix(verbose):
+    renderer = LogurichRenderer(verbose)
+    record = logging.makeLogRecord(
+        {
+            "name": "pkg.module",
+            "levelname": "WARNING",
+            "levelno": logging.WARNING,
+            "lineno": 12,
+            "created": 1700000000.5,
+        }
+    )
+
+    markup_prefix = Text.from_markup(renderer.build_prefix(record))
+    styled_prefix = renderer.build_prefix_text(record)
+
+    assert renderer.build_prefix_plain(record) == markup_prefix.plain
+    assert styled_prefix.plain == markup_prefix.plain
+    assert styled_prefix.spans == markup_prefix.spans
+
+
+def test_render_cache_reuses_repeated_renderables(buffer):
+    init_logger("INFO", enqueue=False, render_cache_size=8)
+    log = logging.getLogger("tests.render_cache")
+    table = Table("name", "value")
+    table.add_row("retries", "3")
+
+    log.rich("INFO", {"service": "api", "port": 8080}, title="Config")
+    log.rich("INFO", {"service": "api", "port": 8080}, title="Config")
+    log.rich("INFO", table, title="Status", cache_key="status")
+    table.add_row("timeout", "30")
+    log.rich("INFO", table, title="Status", cache_key="status")
+    cache = sys.modules["logurich.console"]._render_cache
+    shutdown_logger()
+
+    assert len(cache) == 2
+    output = buffer.getvalue()
+    assert output.count("'service': 'api'") == 2
+    assert output.count("retries") == 2
+    assert "timeout" not in output
+
+
+def test_renderables_are_prefixed_from_segment_lines(buffer):
+    table = Table("name", "value")
+    for index in range(20):
+        table.add_row(f"row-{index}", str(index))
+
+    rendered = rich_console_renderer("PREFIX | ", True, (table, {"k": 1}))
+
+    assert all(isinstance(item, PrefixedLines) for item in rendered)
+    plain_lines = "\n".join(item.plain() for item in rendered).splitlines()
+    assert all(line.startswith("PREFIX # ") for line in plain_lines)
+    assert "row-19" in plain_lines[-3]
+    assert plain_lines[-1] == "PREFIX # {'k': 1}"
+    assert rich_to_str(*rendered, end="").splitlines() == plain_lines
+
+
+def test_console_size_is_cached_until_resize(monkeypatch):
+    calls = []
+
+    def fake_terminal_size(fd=None):
+        calls.append(fd)
+        return os.terminal_size((132, 40))
+
+    monkeypatch.setattr(os, "get_terminal_size", fake_terminal_size)
+    monkeypatch.delenv("COLUMNS", raising=False)
+    monkeypatch.delenv("TERM", raising=False)
+    console = LogurichConsole(file=io.StringIO())
+
+    assert console.width == 132
+    assert console.width == 132
+    assert len(calls) == 1
+
+    if not hasattr(signal, "SIGWINCH"):
+        return
+    previous = signal.getsignal(signal.SIGWINCH)
+    try:
+        signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+        assert install_resize_handler()
+        _ = console.width  # refresh under the resize handler
+        refreshed = len(calls)
+        _ = console.width
+        assert len(calls) == refreshed
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert console.width == 132
+        assert len(calls) == refreshed + 1
+
+        init_logger("INFO", enqueue=False)
+        shutdown_logger()
+        assert signal.getsignal(signal.SIGWINCH) is signal.SIG_DFL
+    finally:
+        signal.signal(signal.SIGWINCH, previous)
+
+
+def test_rich_to_str_renders_off_screen(buffer):
+    console = rich_configure_console(
+        file=buffer, width=80, force_terminal=True, color_system="truecolor"
+    )
+    results = []
+
+    def render():
+        results.append(rich_to_str("[bold]styled[/bold]", end=""))
+        results.append(rich_to_str("[bold]plain[/bold]", ansi=False, end=""))
+
+    with console._lock:
+        worker = threading.Thread(target=render)
+        worker.start()
+        worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert results == ["\x1b[1mstyled\x1b[0m", "plain"]
+    assert buffer.getvalue() == ""
+
+
+def test_compact_rich_handler_matches_grid_layout(buffer):
+    outputs = []
+    for compact in (False, True):
+        buffer.truncate(0)
+        buffer.seek(0)
+        init_logger("INFO", enqueue=False, rich_handler=True, rich_compact=compact)
+        log = logging.getLogger("tests.compact")
+        log.info("Ready on port %d", 8080, extra={"context": {"app": ctx("api")}})
+        log.info("Multi\nline message")
+        shutdown_logger()
+        outputs.append(re.sub(r"^\[[^\]]*\]", "[time]", buffer.getvalue(), flags=re.M))
+
+    grid, compact = outputs
+    assert compact == grid
+    assert "api ▶  Ready on port 8080" in compact